@@ -4,9 +4,25 @@ import os
 import datetime
 import fdb
 import re
+import time
+import functools
+import contextlib
+import collections
+import logging
+import logging.handlers
+import heapq
+import json
+import getpass
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5 import QtWidgets, QtCore, QtGui
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+import csv
+import tracemalloc
+import tempfile
 import base64
 
 SECRET_KEY = "HR_secret_key_2024"
@@ -31,10 +47,872 @@ def decrypt_password(encoded: str) -> str:
         return ""
 
 
+def db_connect_kwargs():
+    settings = QtCore.QSettings("MyCompany", "HRApp")
+
+    host = settings.value("db/host", "192.168.0.250")
+    path = settings.value("db/path", r"c:\invent\HR.FDB")
+    user = settings.value("db/user", "sysdba")
+
+    encrypted = settings.value("db/password", encrypt_password("m"))
+    password = decrypt_password(encrypted)
+
+    charset = settings.value("db/charset", "WIN1251")
+    port = settings.value("db/port", 3050, type=int)
+
+    if not host or not path:
+        return None
+
+    return dict(
+        dsn=f"{host}:{path}",
+        user=user,
+        password=password,
+        charset=charset,
+        port=port
+    )
+
+
+# ================= ПРОФИЛИРОВАНИЕ =================
+# Включается переменной окружения HR_PERF=1 или скрытым меню «Отладка»
+# (Ctrl+Shift+D). В выключенном состоянии стоимость — одна проверка флага.
+
+class PerfStats:
+
+    # Верхние границы корзин гистограммы, мкс
+    buckets_us = (
+        50, 100, 250, 500,
+        1000, 2500, 5000, 10000,
+        25000, 50000, 100000, 250000,
+        1000000, 5000000
+    )
+
+    def __init__(self):
+        self.enabled = os.environ.get("HR_PERF", "") == "1"
+        self.reset()
+
+    def reset(self):
+        self.counters = collections.Counter()
+        # имя -> [количество, сумма (с), максимум (с), корзины]
+        self.timers = {}
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def record(self, name, seconds):
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = [0, 0.0, 0.0, [0] * (len(self.buckets_us) + 1)]
+            self.timers[name] = timer
+
+        timer[0] += 1
+        timer[1] += seconds
+        timer[2] = max(timer[2], seconds)
+
+        us = seconds * 1000000
+        for i, limit in enumerate(self.buckets_us):
+            if us <= limit:
+                timer[3][i] += 1
+                break
+        else:
+            timer[3][-1] += 1
+
+    def timed(self, name):
+
+        def decorator(func):
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    @contextlib.contextmanager
+    def span(self, name):
+        # Замер участка функции — без диалогов и прочего ожидания пользователя
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def percentile(self, name, p):
+        # Оценка по верхней границе корзины
+        count, _, max_s, buckets = self.timers[name]
+        target = count * p
+        seen = 0
+        for i, n in enumerate(buckets):
+            seen += n
+            if seen >= target and n:
+                if i < len(self.buckets_us):
+                    return min(self.buckets_us[i] / 1000000, max_s)
+                return max_s
+        return max_s
+
+    def snapshot(self):
+        lines = []
+
+        for name in sorted(self.timers):
+            count, total, max_s, _ = self.timers[name]
+            lines.append(
+                f"{name}: n={count} "
+                f"avg={total / count * 1000:.2f}мс "
+                f"p50≤{self.percentile(name, 0.5) * 1000:.2f}мс "
+                f"p95≤{self.percentile(name, 0.95) * 1000:.2f}мс "
+                f"max={max_s * 1000:.2f}мс"
+            )
+
+        for name in sorted(self.counters):
+            lines.append(f"{name}: {self.counters[name]}")
+
+        return "\n".join(lines) if lines else "Нет данных"
+
+
+PERF = PerfStats()
+
+ROLE_NAMES = {
+    QtCore.Qt.DisplayRole: "display",
+    QtCore.Qt.EditRole: "edit",
+    QtCore.Qt.BackgroundRole: "background",
+    QtCore.Qt.ForegroundRole: "foreground",
+    QtCore.Qt.FontRole: "font",
+    QtCore.Qt.TextAlignmentRole: "alignment",
+    QtCore.Qt.ToolTipRole: "tooltip",
+    QtCore.Qt.DecorationRole: "decoration",
+    QtCore.Qt.SizeHintRole: "size_hint",
+}
+
+
+def app_data_path(name):
+    folder = QtCore.QStandardPaths.writableLocation(
+        QtCore.QStandardPaths.AppDataLocation
+    )
+    if not folder:
+        folder = os.path.dirname(os.path.abspath(sys.argv[0]))
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, name)
+
+
+def perf_log_path():
+    return app_data_path("perf.log")
+
+
+class PerfOverlay(QtWidgets.QLabel):
+
+    # Каждые N обновлений оверлея снимок пишется в лог
+    log_every = 10
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+        self.setAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop)
+        self.setStyleSheet("""
+            QLabel {
+                background-color: rgba(30, 30, 30, 200);
+                color: #00ff88;
+                font-family: Consolas;
+                font-size: 11px;
+                padding: 6px;
+            }
+        """)
+        self.hide()
+
+        self.logger = None
+        self.ticks = 0
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+
+    def start(self):
+        if self.logger is None:
+            self.logger = logging.getLogger("HRApp.perf")
+            self.logger.setLevel(logging.INFO)
+            self.logger.propagate = False
+            handler = logging.handlers.RotatingFileHandler(
+                perf_log_path(),
+                maxBytes=1024 * 1024,
+                backupCount=3,
+                encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s\n%(message)s"))
+            self.logger.addHandler(handler)
+
+        self.ticks = 0
+        self.refresh()
+        self.show()
+        self.raise_()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        self.hide()
+        self.write_log()
+
+    def refresh(self):
+        self.setText(PERF.snapshot())
+        self.adjustSize()
+
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - 10, 10)
+
+        self.ticks += 1
+        if self.ticks % self.log_every == 0:
+            self.write_log()
+
+    def write_log(self):
+        if self.logger is not None:
+            self.logger.info(PERF.snapshot())
+
+
+# ================= ЮБИЛЕИ =================
+
+MILESTONES = [15, 20, 25, 30]
+
+SERVICE_BRACKETS = ["до 15", "15–20", "20–25", "25–30", "30 и более", "без даты"]
+
+
+def add_years(date, years):
+    # 29 февраля в невисокосный год — 28 февраля
+    try:
+        return date.replace(year=date.year + years)
+    except ValueError:
+        return date.replace(year=date.year + years, day=28)
+
+
+def add_months(date, months):
+    month_index = date.year * 12 + date.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+    for day in (date.day, 30, 29, 28):
+        try:
+            return date.replace(year=year, month=month, day=day)
+        except ValueError:
+            continue
+
+
+def months_until(date, today):
+    # Разница в календарных месяцах: подсветка «скоро юбилей» горит,
+    # пока 0 <= months_until(юбилей, сегодня) <= highlight/month_value
+    return (date.year - today.year) * 12 + (date.month - today.month)
+
+
+def highlight_start(milestone_date, months_limit):
+    # Первый день, с которого горит подсветка, — 1-е число месяца
+    return add_months(milestone_date.replace(day=1), -months_limit)
+
+
+def service_years(hire_date, today):
+    return today.year - hire_date.year - (
+        (today.month, today.day) < (hire_date.month, hire_date.day)
+    )
+
+
+def service_bracket(hire_date, today):
+    if not hire_date:
+        return SERVICE_BRACKETS[-1]
+
+    years = service_years(hire_date, today)
+    for i, m in enumerate(MILESTONES):
+        if years < m:
+            return SERVICE_BRACKETS[i]
+    return SERVICE_BRACKETS[len(MILESTONES)]
+
+
+class MilestoneStats:
+    """Агрегаты для панели юбилеев.
+
+    Строится за один проход по строкам модели и дальше правится
+    по одной строке при редактировании — перерисовка таблицы
+    к пересчёту не приводит.
+    """
+
+    def __init__(self):
+        self.today = datetime.date.today()
+        self.horizon = add_years(self.today, 1)
+        self.per_row = {}
+        self.month_counts = collections.Counter()
+        self.bracket_counts = collections.Counter()
+
+    def rebuild(self, rows):
+        self.today = datetime.date.today()
+        self.horizon = add_years(self.today, 1)
+        self.per_row = {}
+        self.month_counts.clear()
+        self.bracket_counts.clear()
+
+        for emp_id, fio, hire_date, note in rows:
+            self.update(emp_id, fio, hire_date)
+
+    def contribution(self, fio, hire_date):
+        bracket = service_bracket(hire_date, self.today)
+
+        upcoming = None
+        if hire_date:
+            for m in MILESTONES:
+                d = add_years(hire_date, m)
+                if self.today <= d < self.horizon:
+                    upcoming = (d, m)
+                    break
+
+        return fio, bracket, upcoming
+
+    def update(self, emp_id, fio, hire_date):
+        self.remove(emp_id)
+
+        entry = self.contribution(fio, hire_date)
+        self.per_row[emp_id] = entry
+
+        _, bracket, upcoming = entry
+        self.bracket_counts[bracket] += 1
+        if upcoming:
+            d, m = upcoming
+            self.month_counts[(m, d.year, d.month)] += 1
+
+    def remove(self, emp_id):
+        entry = self.per_row.pop(emp_id, None)
+        if entry is None:
+            return
+
+        _, bracket, upcoming = entry
+        self.bracket_counts[bracket] -= 1
+        if upcoming:
+            d, m = upcoming
+            self.month_counts[(m, d.year, d.month)] -= 1
+
+    def months(self):
+        # 12 месяцев начиная с текущего: [(год, месяц), ...]
+        result = []
+        year, month = self.today.year, self.today.month
+        for _ in range(12):
+            result.append((year, month))
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
+        return result
+
+    def nearest(self, n):
+        upcoming = (
+            (entry[2][0], entry[2][1], entry[0])
+            for entry in self.per_row.values()
+            if entry[2]
+        )
+        return heapq.nsmallest(n, upcoming, key=lambda item: item[0])
+
+
+# ================= РАЗБОР ДАТ =================
+
+def parse_date(text):
+
+    text = text.lower().strip()
+
+    # Убираем слово "год"
+    text = re.sub(r"\bгод\b", "", text)
+
+    # ---------------- 1️⃣ Цифровые форматы ----------------
+
+    # 01022015
+    match = re.search(r"\b(\d{2})(\d{2})(\d{4})\b", text)
+    if match:
+        try:
+            return datetime.date(
+                int(match.group(3)),
+                int(match.group(2)),
+                int(match.group(1))
+            )
+        except:
+            pass
+
+    # 01.02.2015 / 01-02-2015 / 01/02/2015
+    match = re.search(
+        r"\b(\d{1,2})[.\-/](\d{1,2})[.\-/](\d{2,4})\b",
+        text
+    )
+    if match:
+        day = int(match.group(1))
+        month = int(match.group(2))
+        year = int(match.group(3))
+
+        if year < 100:
+            year += 2000
+
+        try:
+            return datetime.date(year, month, day)
+        except:
+            pass
+
+    # ---------------- 2️⃣ Форматы с названием месяца ----------------
+
+    months = {
+        "январ": 1, "феврал": 2, "март": 3, "апрел": 4,
+        "мая": 5, "май": 5, "июн": 6, "июл": 7,
+        "август": 8, "сентябр": 9, "октябр": 10,
+        "ноябр": 11, "декабр": 12,
+
+        # английские
+        "january": 1, "february": 2, "march": 3,
+        "april": 4, "may": 5, "june": 6,
+        "july": 7, "august": 8,
+        "september": 9, "october": 10,
+        "november": 11, "december": 12
+    }
+
+    match = re.search(
+        r"\b(\d{1,2})\s+([а-яa-z]+)\s+(\d{2,4})\b",
+        text
+    )
+
+    if match:
+        day = int(match.group(1))
+        month_text = match.group(2)
+        year = int(match.group(3))
+
+        if year < 100:
+            year += 2000
+
+        for key in months:
+            if key in month_text:
+                try:
+                    return datetime.date(year, months[key], day)
+                except:
+                    pass
+
+    return None
+
+
+# ================= ПОИСК НА СЕРВЕРЕ =================
+# Строка поиска разбирается в параметризованное условие WHERE:
+#   «Иванов Пётр»        — UPPER(fio) STARTING WITH (по индексу)
+#   «*петр»              — UPPER(fio) CONTAINING (подстрока, без индекса)
+#   «2005»               — принятые в 2005 году
+#   «01.02.2005»         — принятые в этот день
+#   «2000..2005», «01.01.2000..31.12.2005» — диапазон дат приема
+
+SEARCH_INDEXES = {
+    "IDX_EMPLOYEES_FIO_UPPER": "CREATE INDEX IDX_EMPLOYEES_FIO_UPPER ON employees COMPUTED BY (UPPER(fio))",
+    "IDX_EMPLOYEES_HIRE_DATE": "CREATE INDEX IDX_EMPLOYEES_HIRE_DATE ON employees (hire_date)",
+}
+
+
+def parse_search_bound(text, upper):
+    text = text.strip()
+    if re.fullmatch(r"\d{4}", text):
+        year = int(text)
+        return datetime.date(year, 12, 31) if upper else datetime.date(year, 1, 1)
+    return parse_date(text)
+
+
+def parse_search(text):
+    conditions = []
+    params = []
+    words = []
+
+    for token in text.split():
+
+        if ".." in token:
+            low, high = token.split("..", 1)
+            low = parse_search_bound(low, False)
+            high = parse_search_bound(high, True)
+            if low and high:
+                conditions.append("hire_date BETWEEN ? AND ?")
+                params.extend([low, high])
+                continue
+
+        if re.fullmatch(r"(19|20)\d{2}", token):
+            conditions.append("hire_date BETWEEN ? AND ?")
+            params.extend([
+                parse_search_bound(token, False),
+                parse_search_bound(token, True)
+            ])
+            continue
+
+        if re.search(r"\d", token):
+            d = parse_date(token)
+            if d:
+                conditions.append("hire_date = ?")
+                params.append(d)
+                continue
+
+        words.append(token)
+
+    if words:
+        phrase = " ".join(words)
+        if phrase.startswith("*"):
+            conditions.append("UPPER(fio) CONTAINING ?")
+            phrase = phrase[1:]
+        else:
+            conditions.append("UPPER(fio) STARTING WITH ?")
+        params.append(phrase.upper())
+
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where, tuple(params)
+
+
+class QueryCache:
+    """LRU-кэш страниц результатов поиска."""
+
+    def __init__(self, size=32):
+        self.size = size
+        self.items = collections.OrderedDict()
+
+    def get(self, key):
+        if key not in self.items:
+            return None
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.size:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
+
+
+# ================= ЭКСПОРТ =================
+# Три способа записи — от самого нарядного до самого дешёвого.
+# Выбор по числу строк (export/stream_threshold, export/csv_threshold);
+# значения по умолчанию подобраны по bench_export.py. Потоковая запись
+# не быстрее полной (на 5–20% медленнее), зато память не растёт: полная
+# книга держит ~2 МБ на 1000 строк. CSV — когда xlsx пишется дольше
+# нескольких секунд (50000 строк — около 7 с).
+
+EXPORT_STREAM_THRESHOLD = 20000
+EXPORT_CSV_THRESHOLD = 50000
+
+
+def choose_export_strategy(row_count, stream_threshold, csv_threshold):
+    if row_count >= csv_threshold:
+        return "csv"
+    if row_count >= stream_threshold:
+        return "stream"
+    return "full"
+
+
+class ExportProfile:
+    """Время по фазам одного экспорта; пиковая память — по запросу.
+
+    tracemalloc замедляет запись в несколько раз, поэтому время и память
+    меряются в разных прогонах (см. bench_export.py). Трассировка идёт
+    только внутри ``with profile:`` и выключается при любом исходе.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.phases = []
+        self.peak = 0
+
+    def __enter__(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.trace_memory:
+            self.peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def phase(self, name):
+        profile = self
+
+        class Phase:
+            def __enter__(self):
+                self.start = time.perf_counter()
+
+            def __exit__(self, *exc):
+                elapsed = time.perf_counter() - self.start
+                profile.phases.append((name, elapsed))
+                if PERF.enabled:
+                    PERF.record(f"export.{name}", elapsed)
+
+        return Phase()
+
+    def report(self, strategy, row_count):
+        parts = [f"{name} {elapsed:.2f} с" for name, elapsed in self.phases]
+        text = f"{strategy}, строк: {row_count}; " + ", ".join(parts)
+        if self.peak:
+            text += f"; пик памяти {self.peak / 1024 / 1024:.1f} МБ"
+        return text
+
+
+def write_xlsx_full(path, headers, rows, colors, widths, profile):
+    with profile.phase("write"):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Сотрудники"
+
+        ws.append(headers)
+        for row_data in rows:
+            ws.append(row_data)
+
+    with profile.phase("style"):
+        for cell in ws[1]:
+            cell.font = Font(bold=True)
+
+        # Одна заливка на цвет, а не на строку
+        fills = {}
+        for excel_row, row_color in enumerate(colors, start=2):
+            if not row_color:
+                continue
+            fill = fills.get(row_color)
+            if fill is None:
+                fill = fills[row_color] = PatternFill(
+                    start_color=row_color,
+                    end_color=row_color,
+                    fill_type="solid"
+                )
+            # ws[row] пересчитывает max_column по всем ячейкам листа —
+            # на каждой строке это давало квадратичное время
+            for col in range(1, len(headers) + 1):
+                ws.cell(row=excel_row, column=col).fill = fill
+
+        # Ширина уже посчитана при сборе данных
+        for col, width in enumerate(widths, start=1):
+            ws.column_dimensions[get_column_letter(col)].width = width + 2
+
+    with profile.phase("save"):
+        wb.save(path)
+
+
+def write_xlsx_stream(path, headers, rows, colors, widths, profile):
+    # write_only: строки сразу уходят во временный файл, в памяти
+    # только текущая; стили общие на весь лист. Заливка ставится вместе
+    # с записью строки, поэтому отдельной фазы style здесь нет
+    with profile.phase("setup"):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Сотрудники")
+
+        for col, width in enumerate(widths, start=1):
+            ws.column_dimensions[get_column_letter(col)].width = width + 2
+
+        bold = Font(bold=True)
+        fills = {}
+
+    with profile.phase("write+style"):
+        header_cells = []
+        for value in headers:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.font = bold
+            header_cells.append(cell)
+        ws.append(header_cells)
+
+        for row_data, row_color in zip(rows, colors):
+            if not row_color:
+                ws.append(row_data)
+                continue
+
+            fill = fills.get(row_color)
+            if fill is None:
+                fill = fills[row_color] = PatternFill(
+                    start_color=row_color,
+                    end_color=row_color,
+                    fill_type="solid"
+                )
+
+            cells = []
+            for value in row_data:
+                cell = WriteOnlyCell(ws, value=value)
+                cell.fill = fill
+                cells.append(cell)
+            ws.append(cells)
+
+    with profile.phase("save"):
+        wb.save(path)
+
+
+def write_csv(path, headers, rows, colors, widths, profile):
+    # Excel в русской локали ждёт «;» и BOM
+    with profile.phase("write"):
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(headers)
+            writer.writerows(rows)
+
+
+EXPORT_WRITERS = {
+    "full": (write_xlsx_full, ".xlsx"),
+    "stream": (write_xlsx_stream, ".xlsx"),
+    "csv": (write_csv, ".csv"),
+}
+
+
+# ================= ДОСТУП К БД =================
+# Кто и как ходит в базу:
+# * Соединение fdb используется только тем потоком, который его открыл.
+#   EmployeesDb.conn принадлежит GUI-потоку. Фоновая работа (загрузка,
+#   журнал, синхронизация, экспорт) открывает своё соединение по
+#   db_connect_kwargs() в рабочем потоке и там же его закрывает.
+# * Чтение — транзакция READ COMMITTED READ ONLY. Она не ставит блокировок,
+#   не ждёт чужих и не держит сборку мусора на сервере, поэтому её можно
+#   не закрывать между запросами и держать хоть на рабочем потоке.
+# * Запись — отдельная короткая транзакция READ COMMITTED: начинается на
+#   первом запросе пачки и сразу закрывается commit/rollback. Строку,
+#   занятую чужой транзакцией, ждём не дольше WRITE_LOCK_TIMEOUT секунд,
+#   дальше — ошибка записи, а не зависший GUI.
+# * GUI-поток не ждёт рабочие потоки, пока у него открыта транзакция
+#   записи, — так наши же соединения не заблокируют друг друга.
+
+WRITE_LOCK_TIMEOUT = 5
+
+READ_TPB = fdb.ISOLATION_LEVEL_READ_COMMITED_RO
+
+
+def write_tpb():
+    tpb = fdb.TPB()
+    tpb.access_mode = fdb.isc_tpb_write
+    tpb.isolation_level = (fdb.isc_tpb_read_committed, fdb.isc_tpb_rec_version)
+    tpb.lock_resolution = fdb.isc_tpb_wait
+    tpb.lock_timeout = WRITE_LOCK_TIMEOUT
+    return tpb
+
+
+def read_in_worker(connect_kwargs, sql, params=()):
+    # Для рабочего потока: своё соединение, только чтение
+    conn = fdb.connect(**connect_kwargs)
+    try:
+        tr = conn.trans(default_tpb=READ_TPB)
+        cur = tr.cursor()
+        cur.execute(sql, params)
+        fetched = cur.fetchall()
+        tr.commit()
+        return fetched
+    finally:
+        conn.close()
+
+
+class SchemaError(Exception):
+    pass
+
+
+class EmployeesDb:
+
+    def __init__(self, connection, connect_kwargs=None):
+        self.conn = connection
+        self.connect_kwargs = connect_kwargs
+
+        self.read_tr = connection.trans(default_tpb=READ_TPB)
+        self.read_cur = self.read_tr.cursor()
+
+        self.write_tr = connection.trans(default_tpb=write_tpb())
+        self.write_cur = self.write_tr.cursor()
+
+        # SQL -> подготовленный запрос; после commit он остаётся подготовленным
+        self.statements = {}
+
+    # ---------- Чтение ----------
+    @PERF.timed("db.read")
+    def fetchall(self, sql, params=()):
+        self.read_cur.execute(sql, params)
+        return self.read_cur.fetchall()
+
+    def fetchone(self, sql, params=()):
+        self.read_cur.execute(sql, params)
+        return self.read_cur.fetchone()
+
+    # ---------- Запись ----------
+    def execute(self, sql, params=()):
+        ps = self.statements.get(sql)
+        if ps is None:
+            ps = self.statements[sql] = self.write_cur.prep(sql)
+        self.write_cur.execute(ps, params)
+        return self.write_cur.rowcount
+
+    def fetch_returning(self):
+        # Результат INSERT ... RETURNING последнего execute
+        return self.write_cur.fetchone()
+
+    def commit(self):
+        self.write_tr.commit()
+
+    def rollback(self):
+        if self.write_tr.active:
+            self.write_tr.rollback()
+
+    # ---------- Структура ----------
+    def ensure_version_column(self):
+        # Разовая миграция при подключении: столбец версии для
+        # оптимистичной блокировки (см. UPDATE_SQL)
+        if self.fetchone(
+            "SELECT 1 FROM RDB$RELATION_FIELDS "
+            "WHERE RDB$RELATION_NAME = 'EMPLOYEES' AND RDB$FIELD_NAME = 'VERSION'"
+        ):
+            return
+
+        try:
+            self.execute_ddl("ALTER TABLE employees ADD version INTEGER DEFAULT 0")
+            self.execute("UPDATE employees SET version = 0 WHERE version IS NULL")
+            self.commit()
+        except Exception as e:
+            self.rollback()
+            raise SchemaError(
+                "В таблице EMPLOYEES нет столбца VERSION, а добавить его "
+                "не удалось. Нужны права на ALTER TABLE, и таблица не должна "
+                "быть занята другими подключениями.\n\n"
+                "Администратор БД может выполнить:\n"
+                "ALTER TABLE employees ADD version INTEGER DEFAULT 0;\n"
+                "UPDATE employees SET version = 0;\n\n"
+                f"Ошибка сервера: {e}"
+            )
+
+    def execute_ddl(self, sql):
+        # Метаданные меняем без открытого чтения, кэш запросов после — устарел
+        if self.read_tr.active:
+            self.read_tr.commit()
+        try:
+            self.write_cur.execute(sql)
+            self.write_tr.commit()
+        except Exception:
+            self.rollback()
+            raise
+        finally:
+            self.statements.clear()
+
+
 # ================= MODEL =================
 
+# Оптимистичная блокировка: каждая запись меняет version, а UPDATE/DELETE
+# проходят только если версия в БД та же, что была прочитана клиентом.
+UPDATE_SQL = """
+    UPDATE employees
+    SET fio=?, hire_date=?, note=?, version=version+1
+    WHERE id=? AND version=?
+"""
+
+DELETE_SQL = "DELETE FROM employees WHERE id = ? AND version = ?"
+
+INSERT_WITH_ID_SQL = """
+    INSERT INTO employees (id, fio, hire_date, note, version)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+SELECT_ROW_SQL = "SELECT id, fio, hire_date, note, version FROM employees WHERE id = ?"
+
+SELECT_ALL_SQL = "SELECT id, fio, hire_date, note, version FROM employees ORDER BY id"
+
+CREATE_SQL = """
+    INSERT INTO employees (fio, hire_date, note, version)
+    VALUES (?, ?, ?, 0) RETURNING id
+"""
+
+
 class EmployeesModel(QtCore.QAbstractTableModel):
 
+    statsChanged = QtCore.pyqtSignal()
+
     headers = [
         "№",
         "ФИО",
@@ -44,16 +922,221 @@ class EmployeesModel(QtCore.QAbstractTableModel):
         "Примечание"
     ]
 
-    def __init__(self, connection):
+    writeFailed = QtCore.pyqtSignal(str)
+    # (номер загрузки, future с выборкой рабочего потока)
+    rowsLoaded = QtCore.pyqtSignal(int, object)
+    # [(emp_id, мои значения или None, значения в БД или None, версия в БД)]
+    conflictsDetected = QtCore.pyqtSignal(list)
+
+    # Пачка операций отмены/повтора пишется в БД одной транзакцией
+    # через flush_delay мс после последнего изменения
+    flush_delay = 300
+
+    # Размер страницы в режиме поиска на сервере
+    page_size = 200
+
+    def __init__(self, db, server_mode=False, background=False):
         super().__init__()
-        self.conn = connection
-        self.cur = connection.cursor()
-        self.load()
+        self.db = db
+        self.rows = []
+        # emp_id -> номер строки, см. row_of
+        self.row_index = None
+        self.stats = MilestoneStats()
+        self.audit = None
+        self.versions = {}
+
+        self.server_mode = server_mode
+        self.search_where, self.search_params = "", ()
+        self.pages_loaded = 0
+        self.has_more = False
+        self.query_cache = QueryCache()
+        if server_mode:
+            self.ensure_search_indexes()
+
+        self.undo_stack = QtWidgets.QUndoStack(self)
+
+        self.pending_writes = []
+        self.flush_timer = QtCore.QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(self.flush_delay)
+        self.flush_timer.timeout.connect(self.flush_writes)
+
+        self.loading = False
+        self.load_generation = 0
+        self.loader = None
+        self.rowsLoaded.connect(self.apply_loaded)
+
+        if background and not server_mode and db.connect_kwargs:
+            self.load_in_background()
+        else:
+            self.load()
 
     # ---------- Загрузка данных ----------
+    @PERF.timed("model.load")
     def load(self):
-        self.cur.execute("SELECT id, fio, hire_date, note FROM employees ORDER BY id")
-        self.rows = self.cur.fetchall()
+        self.flush_all()
+        # Фоновая выборка, если она ещё идёт, больше не нужна
+        self.load_generation += 1
+        self.loading = False
+
+        if self.server_mode:
+            self.versions = {}
+            self.rows, self.has_more = self.fetch_page(0)
+            self.pages_loaded = 1
+        else:
+            self.versions = {}
+            self.rows = self.take_rows(self.db.fetchall(SELECT_ALL_SQL))
+
+        self.row_index = None
+        self.stats.rebuild(self.rows)
+        self.statsChanged.emit()
+
+    def load_in_background(self):
+        # Полная выборка на рабочем потоке со своим соединением,
+        # строки приходят в GUI-поток сигналом rowsLoaded
+        self.load_generation += 1
+        generation = self.load_generation
+        self.loading = True
+
+        if self.loader is None:
+            self.loader = ThreadPoolExecutor(max_workers=1)
+
+        connect_kwargs = self.db.connect_kwargs
+
+        def fetch():
+            # Время выборки меряем здесь, а пишем в PERF из GUI-потока
+            start = time.perf_counter()
+            fetched = read_in_worker(connect_kwargs, SELECT_ALL_SQL)
+            return fetched, time.perf_counter() - start
+
+        self.load_started = time.perf_counter()
+        future = self.loader.submit(fetch)
+        future.add_done_callback(lambda f: self.rowsLoaded.emit(generation, f))
+
+    def apply_loaded(self, generation, future):
+        if generation != self.load_generation:
+            return
+
+        try:
+            fetched, fetch_time = future.result()
+        except Exception:
+            # Второе соединение не открылось — читаем по-старому, здесь
+            self.beginResetModel()
+            self.load()
+            self.endResetModel()
+            return
+
+        self.loading = False
+        apply_start = time.perf_counter()
+        self.beginResetModel()
+        self.versions = {}
+        self.rows = self.take_rows(fetched)
+        self.row_index = None
+        self.stats.rebuild(self.rows)
+        self.endResetModel()
+        self.statsChanged.emit()
+
+        # model.load — от запроса до готовой таблицы, как и у синхронной
+        # загрузки; отдельно выборка на рабочем потоке и сброс модели в GUI
+        if PERF.enabled:
+            now = time.perf_counter()
+            PERF.record("model.load", now - self.load_started)
+            PERF.record("model.load.fetch", fetch_time)
+            PERF.record("model.load.apply", now - apply_start)
+
+    def take_rows(self, fetched, known=()):
+        # (id, fio, hire_date, note, version) -> строки модели + self.versions.
+        # Строки из known уже на экране со своими значениями: их версию
+        # не трогаем, иначе следующая правка прошла бы проверку версии
+        # поверх чужого изменения, которого пользователь не видел
+        rows = []
+        for emp_id, fio, hire_date, note, version in fetched:
+            if emp_id in known:
+                continue
+            self.versions[emp_id] = version or 0
+            rows.append((emp_id, fio, hire_date, note))
+        return rows
+
+    def fetch_row(self, emp_id):
+        # Свежая строка из БД: (значения, версия) или (None, None), если удалена
+        fetched = self.db.fetchone(SELECT_ROW_SQL, (emp_id,))
+        if fetched is None:
+            return None, None
+        emp_id, fio, hire_date, note, version = fetched
+        return (emp_id, fio, hire_date, note), version or 0
+
+    # ---------- Поиск на сервере ----------
+    def ensure_search_indexes(self):
+        # Индексы создаются один раз; без прав на DDL просто работаем без них
+        try:
+            existing = {
+                row[0] for row in self.db.fetchall(
+                    "SELECT TRIM(RDB$INDEX_NAME) FROM RDB$INDICES "
+                    "WHERE RDB$RELATION_NAME = 'EMPLOYEES'"
+                )
+            }
+
+            for name, ddl in SEARCH_INDEXES.items():
+                if name not in existing:
+                    self.db.execute_ddl(ddl)
+        except Exception:
+            pass
+
+    @PERF.timed("db.searchPage")
+    def fetch_page(self, page, known=()):
+        key = (self.search_where, self.search_params, page)
+        cached = self.query_cache.get(key)
+        if cached is not None:
+            if PERF.enabled:
+                PERF.count("db.searchCacheHit")
+            return self.take_rows(cached[0], known), cached[1]
+
+        # Берём на одну строку больше, чтобы знать, есть ли следующая страница
+        fetched = self.db.fetchall(
+            "SELECT FIRST ? SKIP ? id, fio, hire_date, note, version FROM employees"
+            + self.search_where + " ORDER BY id",
+            (self.page_size + 1, page * self.page_size) + self.search_params
+        )
+        has_more = len(fetched) > self.page_size
+        fetched = fetched[:self.page_size]
+
+        self.query_cache.put(key, (tuple(fetched), has_more))
+        return self.take_rows(fetched, known), has_more
+
+    def set_search(self, text):
+        where, params = parse_search(text)
+        if (where, params) == (self.search_where, self.search_params):
+            return
+
+        self.flush_all()
+        self.search_where, self.search_params = where, params
+        # Команды отмены ссылаются на строки прежней выборки
+        self.reload()
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return self.server_mode and self.has_more and not parent.isValid()
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        self.flush_all()
+        # Сдвиг страниц после чужих вставок/удалений даёт повторы — их пропускаем
+        known = {values[0] for values in self.rows}
+        rows, self.has_more = self.fetch_page(self.pages_loaded, known)
+        self.pages_loaded += 1
+
+        if not rows:
+            return
+
+        start = len(self.rows)
+        self.beginInsertRows(QtCore.QModelIndex(), start, start + len(rows) - 1)
+        self.rows.extend(rows)
+        self.row_index = None
+        for emp_id, fio, hire_date, note in rows:
+            self.stats.update(emp_id, fio, hire_date)
+        self.endInsertRows()
+        self.statsChanged.emit()
 
     # ---------- Размеры ----------
     def rowCount(self, parent=None):
@@ -65,6 +1148,9 @@ class EmployeesModel(QtCore.QAbstractTableModel):
     # ---------- Отображение ----------
     def data(self, index, role):
 
+        if PERF.enabled:
+            PERF.count(f"model.data/{ROLE_NAMES.get(role, role)}")
+
         if not index.isValid():
             return None
 
@@ -105,9 +1191,7 @@ class EmployeesModel(QtCore.QAbstractTableModel):
 
                 next_date = self.get_next_milestone_date(hire_date)
                 if next_date:
-                    today = datetime.date.today()
-                    delta_months = (next_date.year - today.year) * 12 + \
-                                   (next_date.month - today.month)
+                    delta_months = months_until(next_date, datetime.date.today())
 
                     if 0 <= delta_months <= months_limit:
                         color = settings.value(
@@ -133,122 +1217,940 @@ class EmployeesModel(QtCore.QAbstractTableModel):
 
     def get_next_milestone_date(self, hire_date):
 
-        milestones = [15, 20, 25, 30]
-        years = self.calculate_experience(hire_date)
+        years = self.calculate_experience(hire_date)
+
+        for m in MILESTONES:
+            if years < m:
+                return add_years(hire_date, m)
+
+        return None
+
+    # ---------- Заголовки ----------
+    def headerData(self, section, orientation, role):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    # ---------- Редактирование ----------
+    editable_columns = (1, 2, 5)
+
+    def flags(self, index):
+        if index.column() in self.editable_columns:
+            return QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsEditable
+        return QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
+
+    @PERF.timed("model.setData")
+    def setData(self, index, value, role):
+
+        if role != QtCore.Qt.EditRole:
+            return False
+
+        row = index.row()
+        old = self.rows[row]
+        emp_id, fio, hire_date, note = old
+
+        if index.column() == 1:
+            fio = value
+
+
+        elif index.column() == 2:
+            if not value:
+                hire_date = None
+            else:
+                try:
+                    hire_date = datetime.datetime.strptime(
+                        value, "%d.%m.%Y"
+                    ).date()
+                except:
+                    return False
+
+        elif index.column() == 5:
+            note = value
+
+        new = (emp_id, fio, hire_date, note)
+        if new == old:
+            return True
+
+        self.undo_stack.push(EditCommand(
+            self,
+            {emp_id: (old, new)},
+            f"Изменение «{self.headers[index.column()]}»",
+            cell=(emp_id, index.column())
+        ))
+
+        return True
+
+    # ---------- Массовое изменение ----------
+    @PERF.timed("model.bulkUpdate")
+    def bulk_update(self, changes):
+        # changes: {source_row: {column: текст}}
+        # Всё проверяется целиком; при ошибке ничего не пишется,
+        # возвращается список ошибок.
+        errors = []
+        updated = {}
+
+        for row, values in changes.items():
+            old = self.rows[row]
+            emp_id, fio, hire_date, note = old
+
+            for col, text in values.items():
+                text = (text or "").strip()
+
+                if col == 1:
+                    fio = text
+                elif col == 2:
+                    if not text:
+                        hire_date = None
+                    else:
+                        hire_date = parse_date(text)
+                        if hire_date is None:
+                            errors.append(
+                                f"Строка {row + 1}: не удалось разобрать дату «{text}»"
+                            )
+                elif col == 5:
+                    note = text
+                else:
+                    errors.append(
+                        f"Строка {row + 1}: столбец «{self.headers[col]}» не редактируется"
+                    )
+
+            new = (emp_id, fio, hire_date, note)
+            if new != old:
+                updated[emp_id] = (old, new)
+
+        if errors:
+            return errors
+
+        if not updated:
+            return []
+
+        self.undo_stack.push(EditCommand(
+            self,
+            updated,
+            f"Массовое изменение ({len(updated)} строк)"
+        ))
+
+        # Одна транзакция сразу, а не по таймеру
+        self.flush_writes()
+
+        return []
+
+    def emit_rows_changed(self, rows):
+        # Один dataChanged на каждый непрерывный диапазон строк
+        rows = sorted(rows)
+        start = prev = rows[0]
+
+        for row in rows[1:] + [None]:
+            if row is not None and row == prev + 1:
+                prev = row
+                continue
+
+            self.dataChanged.emit(
+                self.index(start, 0),
+                self.index(prev, 5)
+            )
+
+            if row is not None:
+                start = prev = row
+
+    # ---------- Примитивы для команд отмены ----------
+    # Меняют self.rows и ставят запись в очередь (write=False — только
+    # локально, для принятия чужих изменений); в стек не попадают.
+
+    def row_of(self, emp_id):
+        # Индекс строится лениво, один раз на пачку правок; вставка,
+        # удаление и перезагрузка его сбрасывают, правка значений — нет
+        if self.row_index is None:
+            self.row_index = {values[0]: row for row, values in enumerate(self.rows)}
+        return self.row_index.get(emp_id)
+
+    def apply_values(self, values_by_id, write=True):
+        changed_rows = []
+
+        for emp_id, values in values_by_id.items():
+            row = self.row_of(emp_id)
+            if row is None:
+                continue
+
+            old = self.rows[row]
+            self.rows[row] = values
+            _, fio, hire_date, note = values
+            self.stats.update(emp_id, fio, hire_date)
+            if write:
+                self.queue_write("update", emp_id, values, old)
+            changed_rows.append(row)
+
+        if changed_rows:
+            self.emit_rows_changed(changed_rows)
+            self.statsChanged.emit()
+
+    def insert_row_at(self, position, values, write=True):
+        position = min(position, len(self.rows))
+        emp_id, fio, hire_date, note = values
+
+        self.beginInsertRows(QtCore.QModelIndex(), position, position)
+        self.rows.insert(position, values)
+        self.row_index = None
+        self.stats.update(emp_id, fio, hire_date)
+        self.endInsertRows()
+
+        if write:
+            self.queue_write("insert", emp_id, values)
+        self.statsChanged.emit()
+
+    def remove_row_by_id(self, emp_id, write=True):
+        row = self.row_of(emp_id)
+        if row is None:
+            return None
+
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        values = self.rows.pop(row)
+        self.row_index = None
+        self.stats.remove(emp_id)
+        self.endRemoveRows()
+
+        if write:
+            self.queue_write("delete", emp_id, values, values)
+        self.statsChanged.emit()
+
+        return row, values
+
+    # ---------- Отложенная запись ----------
+    def queue_write(self, op, emp_id, values, old=None):
+        # op: "update" / "insert" / "delete"; old — для журнала изменений
+        self.query_cache.clear()
+        self.pending_writes.append((op, emp_id, values, old))
+        self.flush_timer.start()
+
+    @PERF.timed("model.flush")
+    def flush_writes(self):
+        self.flush_timer.stop()
+
+        if not self.pending_writes:
+            return True
+
+        writes, self.pending_writes = self.pending_writes, []
+        conflicted = {}
+        written = []
+        versions = dict(self.versions)
+
+        try:
+            # Одна короткая транзакция записи на всю пачку. UPDATE/DELETE
+            # идут по одному: rowcount каждого нужен, чтобы заметить чужую
+            # правку. Запросы подготовлены один раз на соединение.
+            for op, emp_id, values, old in writes:
+                if emp_id in conflicted:
+                    continue
+
+                _, fio, hire_date, note = values
+                version = versions.get(emp_id, 0)
+
+                if op == "update":
+                    rowcount = self.db.execute(
+                        UPDATE_SQL, (fio, hire_date, note, emp_id, version)
+                    )
+                elif op == "delete":
+                    rowcount = self.db.execute(DELETE_SQL, (emp_id, version))
+                else:
+                    # Возврат удалённой строки: версия новая, чтобы чужой
+                    # кэш со старой версией не перезаписал её молча
+                    version += 1
+                    self.db.execute(
+                        INSERT_WITH_ID_SQL,
+                        (emp_id, fio, hire_date, note, version)
+                    )
+                    versions[emp_id] = version
+                    written.append((emp_id, None, values))
+                    continue
+
+                if rowcount != 1:
+                    conflicted[emp_id] = op
+                    continue
+
+                versions[emp_id] = version + 1
+                written.append((emp_id, old, None if op == "delete" else values))
+
+            self.db.commit()
+
+        except Exception as e:
+            self.db.rollback()
+            self.writeFailed.emit(str(e))
+            return False
+
+        self.versions = versions
+
+        # В журнал — только то, что действительно записано
+        if self.audit is not None:
+            for emp_id, old, new in written:
+                self.audit.record_change(emp_id, old, new)
+
+        if conflicted:
+            self.report_conflicts(conflicted)
+
+        return True
+
+    def flush_all(self):
+        # Конфликт разрешается прямо внутри flush_writes (диалог на
+        # conflictsDetected), и «оставить моё» снова ставит запись в очередь.
+        # Перед перезагрузкой, закрытием или заменой модели дописываем,
+        # пока очередь не опустеет
+        while self.pending_writes:
+            if not self.flush_writes():
+                return False
+        return True
+
+    def report_conflicts(self, conflicted):
+        # Перечитываем только конфликтные строки
+        conflicts = []
+
+        for emp_id, op in conflicted.items():
+            theirs, version = self.fetch_row(emp_id)
+
+            if op == "delete":
+                mine = None
+                if theirs is None:
+                    # Удалили оба — спорить не о чем
+                    continue
+            else:
+                row = self.row_of(emp_id)
+                mine = self.rows[row] if row is not None else None
+
+            conflicts.append((emp_id, mine, theirs, version))
+
+        if conflicts:
+            self.conflictsDetected.emit(conflicts)
+
+    def resolve_conflict(self, emp_id, mine, theirs, version, keep_mine):
+        # Команды отмены рассчитаны на прежние значения
+        self.undo_stack.clear()
+
+        if keep_mine:
+            if mine is None:
+                # Мы удаляли — удаляем поверх их версии
+                self.versions[emp_id] = version
+                self.queue_write("delete", emp_id, theirs, theirs)
+            elif theirs is None:
+                # Они удалили, а мы правили — возвращаем запись
+                self.versions[emp_id] = self.versions.get(emp_id, 0)
+                self.queue_write("insert", emp_id, mine)
+            else:
+                self.versions[emp_id] = version
+                self.queue_write("update", emp_id, mine, theirs)
+            return
+
+        if theirs is None:
+            self.versions.pop(emp_id, None)
+            self.remove_row_by_id(emp_id, write=False)
+        elif mine is None:
+            self.versions[emp_id] = version
+            self.insert_row_at(len(self.rows), theirs, write=False)
+        else:
+            self.versions[emp_id] = version
+            self.apply_values({emp_id: theirs}, write=False)
+
+    # ---------- Добавление ----------
+    def add_employee(self):
+        # Пока строки грузятся в фоне, новая строка затерялась бы при сбросе
+        if self.loading:
+            return
+        self.undo_stack.push(InsertCommand(self, ("Новый сотрудник", None, "")))
+
+    def create_employee(self, fio, hire_date, note):
+        # id выдаёт сервер, поэтому пишем сразу, а не через очередь
+        self.flush_writes()
+
+        try:
+            self.db.execute(CREATE_SQL, (fio, hire_date, note))
+            emp_id = self.db.fetch_returning()[0]
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self.query_cache.clear()
+        self.versions[emp_id] = 0
+
+        if self.audit is not None:
+            self.audit.record_change(emp_id, None, (emp_id, fio, hire_date, note))
+
+        values = (emp_id, fio, hire_date, note)
+        position = len(self.rows)
+
+        self.beginInsertRows(QtCore.QModelIndex(), position, position)
+        self.rows.append(values)
+        self.row_index = None
+        self.stats.update(emp_id, fio, hire_date)
+        self.endInsertRows()
+        self.statsChanged.emit()
+
+        return position, values
+
+    # ---------- Расчет ----------
+    def calculate_experience(self, hire_date):
+        today = datetime.date.today()
+        return today.year - hire_date.year - (
+            (today.month, today.day) < (hire_date.month, hire_date.day)
+        )
+
+    def next_milestone(self, hire_date):
+        milestones = [15, 20, 25, 30, 35, 40, 50, 55, 60]
+        years = self.calculate_experience(hire_date)
+
+        for m in milestones:
+            if years < m:
+                d = add_years(hire_date, m)
+                return f"{d.strftime('%d.%m.%Y')} — будет {m} лет"
+
+        return "Более 30 лет"
+
+    # ---------- автообновление данных ----------
+    def refresh_experience(self):
+        if not self.rows:
+            return
+
+        top_left = self.index(0, 0)
+        bottom_right = self.index(len(self.rows) - 1, 5)
+
+        self.dataChanged.emit(top_left, bottom_right)
+
+    def delete_employee(self, source_row):
+
+        emp_id, fio, hire_date, note = self.rows[source_row]
+
+        self.undo_stack.push(DeleteCommand(self, emp_id, fio))
+
+    def reload(self):
+        self.beginResetModel()
+        self.pending_writes = []
+        self.undo_stack.clear()
+        self.load()
+        self.endResetModel()
+
+
+# ================= ОТМЕНА / ПОВТОР =================
+
+class EditCommand(QtWidgets.QUndoCommand):
+
+    merge_id = 1
+
+    def __init__(self, model, changes, text, cell=None):
+        # changes: {emp_id: (старая строка, новая строка)}
+        super().__init__(text)
+        self.model = model
+        self.changes = changes
+        self.cell = cell
+
+    def id(self):
+        # Сливаются только правки одной ячейки
+        return self.merge_id if self.cell else -1
+
+    def mergeWith(self, other):
+        if other.cell != self.cell:
+            return False
+
+        emp_id = self.cell[0]
+        old, _ = self.changes[emp_id]
+        _, new = other.changes[emp_id]
+        self.changes[emp_id] = (old, new)
+        return True
+
+    def redo(self):
+        self.model.apply_values({
+            emp_id: new for emp_id, (old, new) in self.changes.items()
+        })
+
+    def undo(self):
+        self.model.apply_values({
+            emp_id: old for emp_id, (old, new) in self.changes.items()
+        })
+
+
+class InsertCommand(QtWidgets.QUndoCommand):
+
+    def __init__(self, model, values):
+        super().__init__("Добавление сотрудника")
+        self.model = model
+        self.values = values
+        self.position = None
+
+    def redo(self):
+        if self.position is None:
+            # Первый раз — сервер выдаёт id, дальше вставляем с ним же
+            self.position, self.values = self.model.create_employee(*self.values)
+        else:
+            self.model.insert_row_at(self.position, self.values)
+
+    def undo(self):
+        self.model.remove_row_by_id(self.values[0])
+
+
+class DeleteCommand(QtWidgets.QUndoCommand):
+
+    def __init__(self, model, emp_id, fio):
+        super().__init__(f"Удаление «{fio}»")
+        self.model = model
+        self.emp_id = emp_id
+        self.position = None
+        self.values = None
+
+    def redo(self):
+        removed = self.model.remove_row_by_id(self.emp_id)
+        if removed:
+            self.position, self.values = removed
+
+    def undo(self):
+        # Строка возвращается на своё место без перезагрузки таблицы
+        if self.values:
+            self.model.insert_row_at(self.position, self.values)
+
+# ================= ЖУРНАЛ ИЗМЕНЕНИЙ =================
+# Записи копятся в памяти и раз в flush_interval мс (или по batch_size)
+# уходят пачкой в отдельный поток. У потока своё соединение с БД —
+# соединение GUI в нём не используется. Без связи с БД записи
+# дописываются в локальный файл и переносятся в БД при следующей
+# удачной записи.
+
+AUDIT_TABLE_DDL = """
+    CREATE TABLE employees_audit (
+        emp_id INTEGER,
+        action VARCHAR(10),
+        field_name VARCHAR(30),
+        old_value VARCHAR(1000),
+        new_value VARCHAR(1000),
+        user_name VARCHAR(64),
+        changed_at TIMESTAMP
+    )
+"""
+
+AUDIT_INSERT_SQL = """
+    INSERT INTO employees_audit
+    (emp_id, action, field_name, old_value, new_value, user_name, changed_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+AUDIT_FIELDS = [(1, "ФИО"), (2, "Дата приема"), (3, "Примечание")]
+
+AUDIT_ACTIONS = {"insert": "Добавление", "update": "Изменение", "delete": "Удаление"}
+
+
+def audit_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.date):
+        return value.strftime("%d.%m.%Y")
+    return str(value)[:1000]
+
+
+class AuditLog(QtCore.QObject):
+
+    # (emp_id, записи журнала) — ответ на history()
+    historyReady = QtCore.pyqtSignal(int, list)
+
+    flush_interval = 2000
+    batch_size = 100
+
+    def __init__(self, connect_kwargs, parent=None):
+        super().__init__(parent)
+        self.connect_kwargs = connect_kwargs
+        self.user = getpass.getuser()
+        self.offline_path = app_data_path("audit_offline.jsonl")
+
+        self.buffer = []
+        self.lock = threading.Lock()
+
+        # Один рабочий поток: пачки пишутся строго по порядку
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.worker_conn = None
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(self.flush_interval)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start()
+
+    # ---------- GUI-поток ----------
+    def record_change(self, emp_id, old, new):
+        now = datetime.datetime.now()
+
+        if old is None:
+            # Все поля новой (или возвращённой отменой удаления) записи
+            records = [
+                (emp_id, "insert", name, "", audit_value(new[i]), self.user, now)
+                for i, name in AUDIT_FIELDS
+            ]
+        elif new is None:
+            # Все поля удалённой записи — чтобы по журналу её можно было восстановить
+            records = [
+                (emp_id, "delete", name, audit_value(old[i]), "", self.user, now)
+                for i, name in AUDIT_FIELDS
+            ]
+        else:
+            records = [
+                (emp_id, "update", name,
+                 audit_value(old[i]), audit_value(new[i]), self.user, now)
+                for i, name in AUDIT_FIELDS
+                if old[i] != new[i]
+            ]
+
+        with self.lock:
+            self.buffer.extend(records)
+            full = len(self.buffer) >= self.batch_size
+
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            batch, self.buffer = self.buffer, []
+
+        if batch:
+            return self.executor.submit(self.write_batch, batch)
+        return None
+
+    def history(self, emp_id):
+        # Рабочий поток сначала допишет накопленное, потом прочитает историю.
+        # GUI не ждёт: ответ приходит сигналом historyReady
+        self.flush()
+        future = self.executor.submit(self.read_history, emp_id)
+
+        def done(future):
+            try:
+                records = future.result()
+            except Exception:
+                records = []
+            self.historyReady.emit(emp_id, records)
+
+        future.add_done_callback(done)
+
+    def close(self, wait=False):
+        # Очередь дописывается в фоне; ждать её (wait=True) можно только
+        # при выходе из программы, иначе GUI висел бы на недоступной БД
+        self.timer.stop()
+        self.flush()
+        self.executor.submit(self.close_connection)
+        self.executor.shutdown(wait=wait)
+
+    # ---------- Рабочий поток ----------
+    def connection(self):
+        if self.worker_conn is None:
+            self.worker_conn = fdb.connect(**self.connect_kwargs)
+            cur = self.worker_conn.cursor()
+            cur.execute(
+                "SELECT 1 FROM RDB$RELATIONS WHERE RDB$RELATION_NAME = 'EMPLOYEES_AUDIT'"
+            )
+            if not cur.fetchone():
+                cur.execute(AUDIT_TABLE_DDL)
+                self.worker_conn.commit()
+                cur.execute("CREATE INDEX IDX_EMPLOYEES_AUDIT_EMP ON employees_audit (emp_id)")
+            self.worker_conn.commit()
+        return self.worker_conn
+
+    def close_connection(self):
+        if self.worker_conn is not None:
+            try:
+                self.worker_conn.close()
+            except Exception:
+                pass
+            self.worker_conn = None
+
+    def read_offline(self):
+        if not os.path.exists(self.offline_path):
+            return []
+
+        records = []
+        with open(self.offline_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    record[6] = datetime.datetime.fromisoformat(record[6])
+                    records.append(tuple(record))
+        return records
+
+    @PERF.timed("audit.writeBatch")
+    def write_batch(self, batch):
+        try:
+            conn = self.connection()
+            offline = self.read_offline()
+
+            cur = conn.cursor()
+            cur.executemany(AUDIT_INSERT_SQL, offline + batch)
+            conn.commit()
+
+            if offline:
+                os.remove(self.offline_path)
+
+        except Exception:
+            self.close_connection()
+            with open(self.offline_path, "a", encoding="utf-8") as f:
+                for record in batch:
+                    record = list(record)
+                    record[6] = record[6].isoformat()
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def read_history(self, emp_id):
+        records = [r for r in self.read_offline() if r[0] == emp_id]
+
+        try:
+            cur = self.connection().cursor()
+            cur.execute(
+                "SELECT emp_id, action, field_name, old_value, new_value, "
+                "user_name, changed_at FROM employees_audit WHERE emp_id = ?",
+                (emp_id,)
+            )
+            records.extend(cur.fetchall())
+            self.worker_conn.commit()
+        except Exception:
+            self.close_connection()
+
+        return sorted(records, key=lambda r: r[6])
+
+
+class AuditHistoryDialog(QtWidgets.QDialog):
+
+    def __init__(self, fio, records, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"История изменений — {fio}")
+        self.resize(800, 400)
+
+        layout = QtWidgets.QVBoxLayout(self)
+
+        table = QtWidgets.QTableWidget(len(records), 6)
+        table.setHorizontalHeaderLabels(
+            ["Когда", "Кто", "Действие", "Поле", "Было", "Стало"]
+        )
+        table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+
+        for row, (_, action, field, old, new, user, changed_at) in enumerate(records):
+            values = [
+                changed_at.strftime("%d.%m.%Y %H:%M:%S"),
+                user,
+                AUDIT_ACTIONS.get(action, action),
+                field,
+                old,
+                new
+            ]
+            for col, value in enumerate(values):
+                table.setItem(row, col, QtWidgets.QTableWidgetItem(value or ""))
+
+        layout.addWidget(table)
+
+
+# ================= НАПОМИНАНИЯ =================
+# Расписание строится один раз (те же пороги, что и у подсветки:
+# highlight/month_enabled и highlight/month_value) и дальше сервис спит
+# на одном таймере до ближайшего напоминания. Пересборка — только при
+# изменении данных или настроек подсветки.
+
+class ReminderService(QtCore.QObject):
+
+    # QTimer не принимает интервалы больше ~24 дней; раз в сутки
+    # просыпаемся в любом случае — это переживает и перевод часов
+    max_sleep_ms = 24 * 60 * 60 * 1000
+
+    def __init__(self, tray, parent=None):
+        super().__init__(parent)
+        self.tray = tray
+        self.model = None
+        self.schedule = []
+        # Расписание ведётся только в режиме трея: без значка
+        # напоминание никто не увидит, а «показанным» оно стало бы
+        self.active = False
+
+        self.wake_timer = QtCore.QTimer(self)
+        self.wake_timer.setSingleShot(True)
+        self.wake_timer.timeout.connect(self.wake)
+
+        # Серия правок — одна пересборка
+        self.rebuild_timer = QtCore.QTimer(self)
+        self.rebuild_timer.setSingleShot(True)
+        self.rebuild_timer.setInterval(1000)
+        self.rebuild_timer.timeout.connect(self.rebuild)
+
+    def set_model(self, model):
+        if self.model is not None:
+            self.model.statsChanged.disconnect(self.rebuild_timer.start)
+        self.model = model
+        model.statsChanged.connect(self.rebuild_timer.start)
+        self.rebuild()
+
+    def set_active(self, active):
+        self.active = active
+        self.rebuild()
+
+    @PERF.timed("reminders.rebuild")
+    def rebuild(self):
+        self.wake_timer.stop()
+        self.schedule = []
+
+        settings = QtCore.QSettings("MyCompany", "HRApp")
+        if not self.active or self.model is None or not settings.value(
+            "highlight/month_enabled", False, type=bool
+        ):
+            return
+
+        months_limit = settings.value("highlight/month_value", 6, type=int)
+        shown = set(settings.value("reminders/shown", [], type=list) or [])
+        today = datetime.date.today()
 
-        for m in milestones:
-            if years < m:
-                return hire_date.replace(year=hire_date.year + m)
+        for emp_id, fio, hire_date, note in self.model.rows:
+            if not hire_date:
+                continue
+            for m in MILESTONES:
+                milestone_date = add_years(hire_date, m)
+                if milestone_date < today or f"{emp_id}:{m}" in shown:
+                    continue
+                # В тот же день, когда строка краснеет в таблице
+                remind_at = highlight_start(milestone_date, months_limit)
+                self.schedule.append((remind_at, milestone_date, emp_id, fio, m))
+
+        heapq.heapify(self.schedule)
+        self.wake()
+
+    def wake(self):
+        today = datetime.date.today()
+        due = []
 
-        return None
+        while self.schedule and self.schedule[0][0] <= today:
+            due.append(heapq.heappop(self.schedule))
 
-    # ---------- Заголовки ----------
-    def headerData(self, section, orientation, role):
-        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
-            return self.headers[section]
-        return None
+        if due:
+            self.notify(due)
 
-    # ---------- Редактирование ----------
-    def flags(self, index):
-        if index.column() in (1, 2, 5):
-            return QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsEditable
-        return QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
+        if self.schedule:
+            next_at = datetime.datetime.combine(self.schedule[0][0], datetime.time())
+            delay = (next_at - datetime.datetime.now()).total_seconds() * 1000
+            self.wake_timer.start(int(min(max(delay, 0), self.max_sleep_ms)))
 
-    def setData(self, index, value, role):
+    def notify(self, due):
+        if not self.tray.isVisible():
+            return
 
-        if role != QtCore.Qt.EditRole:
-            return False
+        due.sort(key=lambda item: item[1])
 
-        row = index.row()
-        emp_id, fio, hire_date, note = self.rows[row]
+        lines = [
+            f"{fio} — {m} лет {milestone_date.strftime('%d.%m.%Y')}"
+            for _, milestone_date, emp_id, fio, m in due
+        ]
+        text = "\n".join(lines[:5])
+        if len(lines) > 5:
+            text += f"\n... и ещё {len(lines) - 5}"
 
-        if index.column() == 1:
-            fio = value
+        self.tray.showMessage(
+            "Приближается юбилей",
+            text,
+            QtWidgets.QSystemTrayIcon.Information
+        )
 
+        settings = QtCore.QSettings("MyCompany", "HRApp")
+        shown = set(settings.value("reminders/shown", [], type=list) or [])
+        shown.update(f"{emp_id}:{m}" for _, _, emp_id, _, m in due)
+        settings.setValue("reminders/shown", sorted(shown))
 
-        elif index.column() == 2:
-            if not value:
-                hire_date = None
-            else:
-                try:
-                    hire_date = datetime.datetime.strptime(
-                        value, "%d.%m.%Y"
-                    ).date()
-                except:
-                    return False
 
-        elif index.column() == 5:
-            note = value
+# ================= ПАНЕЛЬ ЮБИЛЕЕВ =================
 
-        self.cur.execute("""
-            UPDATE employees
-            SET fio=?, hire_date=?, note=?
-            WHERE id=?
-        """, (fio, hire_date, note, emp_id))
+class MilestoneDashboard(QtWidgets.QDockWidget):
 
-        self.conn.commit()
+    top_n = 10
 
-        self.rows[row] = (emp_id, fio, hire_date, note)
+    month_names = [
+        "янв", "фев", "мар", "апр", "май", "июн",
+        "июл", "авг", "сен", "окт", "ноя", "дек"
+    ]
 
-        self.dataChanged.emit(
-            self.index(row, 0),
-            self.index(row, 5)
-        )
+    def __init__(self, parent=None):
+        super().__init__("Ближайшие юбилеи", parent)
+        self.setObjectName("milestone_dashboard")
+        self.model = None
 
-        return True
+        widget = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout(widget)
 
-    # ---------- Добавление ----------
-    def add_employee(self):
-        self.cur.execute(
-            "INSERT INTO employees (fio, hire_date, note) VALUES (?, ?, ?)",
-            ("Новый сотрудник", None, "")
+        layout.addWidget(QtWidgets.QLabel("По месяцам (на год вперёд):"))
+        self.months_table = QtWidgets.QTableWidget(12, len(MILESTONES) + 1)
+        self.months_table.setHorizontalHeaderLabels(
+            [f"{m} лет" for m in MILESTONES] + ["Всего"]
         )
-        self.conn.commit()
-        self.layoutAboutToBeChanged.emit()
-        self.load()
-        self.layoutChanged.emit()
-
-    # ---------- Расчет ----------
-    def calculate_experience(self, hire_date):
-        today = datetime.date.today()
-        return today.year - hire_date.year - (
-            (today.month, today.day) < (hire_date.month, hire_date.day)
+        self.months_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.months_table.horizontalHeader().setSectionResizeMode(
+            QtWidgets.QHeaderView.Stretch
         )
+        layout.addWidget(self.months_table)
+
+        layout.addWidget(QtWidgets.QLabel(f"Ближайшие {self.top_n}:"))
+        self.nearest_list = QtWidgets.QListWidget()
+        layout.addWidget(self.nearest_list)
+
+        layout.addWidget(QtWidgets.QLabel("По стажу:"))
+        self.brackets_label = QtWidgets.QLabel()
+        layout.addWidget(self.brackets_label)
+
+        self.setWidget(widget)
+
+        # Смена дня сдвигает окно «год вперёд» — проверяем раз в час
+        self.day_timer = QtCore.QTimer(self)
+        self.day_timer.setInterval(60 * 60 * 1000)
+        self.day_timer.timeout.connect(self.check_day)
+        self.day_timer.start()
+
+    def set_model(self, model):
+        if self.model is not None:
+            self.model.statsChanged.disconnect(self.refresh)
+        self.model = model
+        model.statsChanged.connect(self.refresh)
+        self.refresh()
+
+    def check_day(self):
+        if self.model and self.model.stats.today != datetime.date.today():
+            self.model.stats.rebuild(self.model.rows)
+            self.model.refresh_experience()
+            self.refresh()
+
+    @PERF.timed("dashboard.refresh")
+    def refresh(self):
+        if self.model is None:
+            return
 
-    def next_milestone(self, hire_date):
-        milestones = [15, 20, 25, 30, 35, 40, 50, 55, 60]
-        years = self.calculate_experience(hire_date)
-
-        for m in milestones:
-            if years < m:
-                d = hire_date.replace(year=hire_date.year + m)
-                return f"{d.strftime('%d.%m.%Y')} — будет {m} лет"
+        stats = self.model.stats
+
+        labels = []
+        for row, (year, month) in enumerate(stats.months()):
+            labels.append(f"{self.month_names[month - 1]} {year}")
+            total = 0
+            for col, m in enumerate(MILESTONES):
+                count = stats.month_counts[(m, year, month)]
+                total += count
+                self.months_table.setItem(
+                    row, col, QtWidgets.QTableWidgetItem(str(count or ""))
+                )
+            self.months_table.setItem(
+                row, len(MILESTONES), QtWidgets.QTableWidgetItem(str(total or ""))
+            )
+        self.months_table.setVerticalHeaderLabels(labels)
 
-        return "Более 30 лет"
+        self.nearest_list.clear()
+        for d, m, fio in stats.nearest(self.top_n):
+            self.nearest_list.addItem(f"{d.strftime('%d.%m.%Y')} — {m} лет — {fio}")
 
-    # ---------- автообновление данных ----------
-    def refresh_experience(self):
-        if not self.rows:
-            return
+        self.brackets_label.setText("\n".join(
+            f"{bracket}: {stats.bracket_counts[bracket]}"
+            for bracket in SERVICE_BRACKETS
+        ))
 
-        top_left = self.index(0, 0)
-        bottom_right = self.index(len(self.rows) - 1, 5)
 
-        self.dataChanged.emit(top_left, bottom_right)
+# ================= PROXY =================
 
-    def delete_employee(self, source_row):
+class EmployeesProxyModel(QtCore.QSortFilterProxyModel):
 
-        emp_id, fio, hire_date, note = self.rows[source_row]
+    # Замеряем целиком сортировку и фильтрацию, а не каждое сравнение:
+    # переопределение lessThan/filterAcceptsRow увело бы их в Python.
 
-        self.cur.execute(
-            "DELETE FROM employees WHERE id = ?",
-            (emp_id,)
-        )
-        self.conn.commit()
+    @PERF.timed("proxy.sort")
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        super().sort(column, order)
 
-        self.layoutAboutToBeChanged.emit()
-        self.load()
-        self.layoutChanged.emit()
+    @PERF.timed("proxy.filter")
+    def setFilterFixedString(self, text):
+        super().setFilterFixedString(text)
 
 # ================= DATE DELEGATE =================
 
@@ -287,81 +2189,7 @@ class DateDelegate(QtWidgets.QStyledItemDelegate):
     # -------- Умный парсинг --------
 
     def parse_date(self, text):
-
-        text = text.lower().strip()
-
-        # Убираем слово "год"
-        text = re.sub(r"\bгод\b", "", text)
-
-        # ---------------- 1️⃣ Цифровые форматы ----------------
-
-        # 01022015
-        match = re.search(r"\b(\d{2})(\d{2})(\d{4})\b", text)
-        if match:
-            try:
-                return datetime.date(
-                    int(match.group(3)),
-                    int(match.group(2)),
-                    int(match.group(1))
-                )
-            except:
-                pass
-
-        # 01.02.2015 / 01-02-2015 / 01/02/2015
-        match = re.search(
-            r"\b(\d{1,2})[.\-/](\d{1,2})[.\-/](\d{2,4})\b",
-            text
-        )
-        if match:
-            day = int(match.group(1))
-            month = int(match.group(2))
-            year = int(match.group(3))
-
-            if year < 100:
-                year += 2000
-
-            try:
-                return datetime.date(year, month, day)
-            except:
-                pass
-
-        # ---------------- 2️⃣ Форматы с названием месяца ----------------
-
-        months = {
-            "январ": 1, "феврал": 2, "март": 3, "апрел": 4,
-            "мая": 5, "май": 5, "июн": 6, "июл": 7,
-            "август": 8, "сентябр": 9, "октябр": 10,
-            "ноябр": 11, "декабр": 12,
-
-            # английские
-            "january": 1, "february": 2, "march": 3,
-            "april": 4, "may": 5, "june": 6,
-            "july": 7, "august": 8,
-            "september": 9, "october": 10,
-            "november": 11, "december": 12
-        }
-
-        match = re.search(
-            r"\b(\d{1,2})\s+([а-яa-z]+)\s+(\d{2,4})\b",
-            text
-        )
-
-        if match:
-            day = int(match.group(1))
-            month_text = match.group(2)
-            year = int(match.group(3))
-
-            if year < 100:
-                year += 2000
-
-            for key in months:
-                if key in month_text:
-                    try:
-                        return datetime.date(year, months[key], day)
-                    except:
-                        pass
-
-        return None
+        return parse_date(text)
 
 
 # ================= WINDOW =================
@@ -461,12 +2289,18 @@ class ExperienceApp(QtWidgets.QMainWindow):
             self.setWindowIcon(QtGui.QIcon(icon_path))
 
         self.conn = None
+        self.db = None
+        self.audit = None
+        # emp_id -> ФИО для окон истории, ждущих ответа журнала
+        self.history_requests = {}
         self.init_ui()
         self.connect_to_database()
 
     def init_ui(self):
 
         self.setWindowTitle("Учёт выслуги судей")
+        if self.windowIcon().isNull():
+            self.setWindowIcon(QtWidgets.QApplication.windowIcon())
         self.resize(1200, 650)
 
         central = QtWidgets.QWidget()
@@ -479,6 +2313,13 @@ class ExperienceApp(QtWidgets.QMainWindow):
         self.search_edit.setPlaceholderText("Поиск по всем столбцам...")
         layout.addWidget(self.search_edit)
 
+        # В режиме поиска на сервере запрос уходит после паузы в наборе
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.run_server_search)
+        self.search_edit.textChanged.connect(self.on_search_text)
+
         # ================= Таблица =================
         # ВАЖНО: таблица создаётся БЕЗ модели
         self.table = QtWidgets.QTableView()
@@ -495,6 +2336,19 @@ class ExperienceApp(QtWidgets.QMainWindow):
         # ================= Меню =================
         menubar = self.menuBar()
 
+        # ================= Отмена / повтор =================
+        self.undo_group = QtWidgets.QUndoGroup(self)
+
+        edit_menu = menubar.addMenu("Правка")
+
+        undo_action = self.undo_group.createUndoAction(self, "Отменить")
+        undo_action.setShortcut(QtGui.QKeySequence.Undo)
+        edit_menu.addAction(undo_action)
+
+        redo_action = self.undo_group.createRedoAction(self, "Повторить")
+        redo_action.setShortcut(QtGui.QKeySequence.Redo)
+        edit_menu.addAction(redo_action)
+
         settings_menu = menubar.addMenu("Настройки")
 
         db_action = QtWidgets.QAction("Подключение к БД", self)
@@ -505,19 +2359,128 @@ class ExperienceApp(QtWidgets.QMainWindow):
         highlight_action.triggered.connect(self.open_highlight_settings)
         settings_menu.addAction(highlight_action)
 
+        self.server_search_action = QtWidgets.QAction("Поиск на сервере", self)
+        self.server_search_action.setCheckable(True)
+        self.server_search_action.setChecked(
+            QtCore.QSettings("MyCompany", "HRApp").value(
+                "search/server_mode", False, type=bool
+            )
+        )
+        self.server_search_action.toggled.connect(self.toggle_server_search)
+        settings_menu.addAction(self.server_search_action)
+        self.update_search_placeholder()
+
+        self.tray_action = QtWidgets.QAction("Напоминания в трее", self)
+        self.tray_action.setCheckable(True)
+        self.tray_action.setChecked(
+            QtCore.QSettings("MyCompany", "HRApp").value(
+                "reminders/tray", False, type=bool
+            )
+        )
+        self.tray_action.toggled.connect(self.toggle_tray_mode)
+        settings_menu.addAction(self.tray_action)
+
+        # ================= Трей и напоминания =================
+        self.quitting = False
+
+        self.tray = QtWidgets.QSystemTrayIcon(self.windowIcon(), self)
+        self.tray.setToolTip("Учёт выслуги судей")
+        tray_menu = QtWidgets.QMenu(self)
+        tray_menu.addAction("Открыть", self.show_from_tray)
+        tray_menu.addAction("Выход", self.quit_from_tray)
+        self.tray.setContextMenu(tray_menu)
+        self.tray.activated.connect(
+            lambda reason: self.show_from_tray()
+            if reason == QtWidgets.QSystemTrayIcon.Trigger else None
+        )
+
+        self.reminders = ReminderService(self.tray, self)
+        self.toggle_tray_mode(self.tray_action.isChecked())
+
+        # Вставка блока из Excel — только когда фокус на самой таблице,
+        # в открытом редакторе Ctrl+V работает как обычно
+        paste_action = QtWidgets.QAction("Вставить", self)
+        paste_action.setShortcut(QtGui.QKeySequence.Paste)
+        paste_action.setShortcutContext(QtCore.Qt.WidgetShortcut)
+        paste_action.triggered.connect(self.paste_from_clipboard)
+        self.table.addAction(paste_action)
+
         # 👇 НОВОЕ МЕНЮ СПРАВА
         export_menu = menubar.addMenu("Экспорт данных")
 
         export_action = QtWidgets.QAction("В Excel", self)
-        export_action.triggered.connect(self.export_filtered_to_excel)
+        # Через lambda: обёртка PERF.timed не должна получить флаг checked
+        export_action.triggered.connect(lambda: self.export_filtered_to_excel())
         export_menu.addAction(export_action)
 
+        export_settings_action = QtWidgets.QAction("Настройки экспорта", self)
+        export_settings_action.triggered.connect(self.open_export_settings)
+        export_menu.addAction(export_settings_action)
+
+        # ================= Панель юбилеев =================
+        self.dashboard = MilestoneDashboard(self)
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.dashboard)
+
+        view_menu = menubar.addMenu("Вид")
+        view_menu.addAction(self.dashboard.toggleViewAction())
+
+        # ================= Скрытое меню отладки =================
+        self.perf_overlay = PerfOverlay(self.table)
+
+        self.debug_menu = menubar.addMenu("Отладка")
+        self.debug_menu.menuAction().setVisible(PERF.enabled)
+
+        self.perf_action = QtWidgets.QAction("Оверлей производительности", self)
+        self.perf_action.setCheckable(True)
+        self.perf_action.toggled.connect(self.toggle_perf_overlay)
+        self.debug_menu.addAction(self.perf_action)
+
+        reset_action = QtWidgets.QAction("Сбросить счётчики", self)
+        reset_action.triggered.connect(PERF.reset)
+        self.debug_menu.addAction(reset_action)
+
+        open_log_action = QtWidgets.QAction("Открыть лог", self)
+        open_log_action.triggered.connect(
+            lambda: QtGui.QDesktopServices.openUrl(
+                QtCore.QUrl.fromLocalFile(perf_log_path())
+            )
+        )
+        self.debug_menu.addAction(open_log_action)
+
+        debug_shortcut = QtWidgets.QShortcut(
+            QtGui.QKeySequence("Ctrl+Shift+D"), self
+        )
+        debug_shortcut.activated.connect(
+            lambda: self.debug_menu.menuAction().setVisible(
+                not self.debug_menu.menuAction().isVisible()
+            )
+        )
+
+        if PERF.enabled:
+            self.perf_action.setChecked(True)
+
+    def toggle_perf_overlay(self, checked):
+        PERF.enabled = checked
+        if checked:
+            self.perf_overlay.start()
+        else:
+            self.perf_overlay.stop()
+
     def export_filtered_to_excel(self):
 
         if not hasattr(self, "proxy"):
             QtWidgets.QMessageBox.warning(self, "Ошибка", "Нет данных для экспорта.")
             return
 
+        settings = QtCore.QSettings("MyCompany", "HRApp")
+        # Фазы меряются всегда (это дёшево), в журнал — по настройке.
+        # Память — отдельным проходом: tracemalloc исказил бы время
+        profiling = settings.value("export/profile", False, type=bool)
+        profile_memory = profiling and settings.value(
+            "export/profile_memory", False, type=bool
+        )
+        profile = ExportProfile()
+
         documents_path = QtCore.QStandardPaths.writableLocation(
             QtCore.QStandardPaths.DocumentsLocation
         )
@@ -525,69 +2488,84 @@ class ExperienceApp(QtWidgets.QMainWindow):
         if not documents_path:
             documents_path = QtCore.QCoreApplication.applicationDirPath()
 
-        today_str = datetime.date.today().strftime("%Y-%m-%d")
-        file_path = f"{documents_path}/Список_сотрудников_{today_str}.xlsx"
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Сотрудники"
-
         headers = self.model.headers
-        ws.append(headers)
 
-        for cell in ws[1]:
-            cell.font = Font(bold=True)
+        with profile.phase("gather"):
+            rows = []
+            colors = []
+            widths = [len(h) for h in headers]
 
-        for row in range(self.proxy.rowCount()):
+            for row in range(self.proxy.rowCount()):
 
-            row_data = []
-            row_color = None
+                row_data = []
+                row_color = None
 
-            for col in range(self.proxy.columnCount()):
-                index = self.proxy.index(row, col)
-                value = index.data(QtCore.Qt.DisplayRole)
-                row_data.append(value)
+                for col in range(self.proxy.columnCount()):
+                    index = self.proxy.index(row, col)
+                    value = index.data(QtCore.Qt.DisplayRole)
+                    row_data.append(value)
 
-                # Берём цвет из BackgroundRole
-                if col == 0:
-                    bg = index.data(QtCore.Qt.BackgroundRole)
-                    if isinstance(bg, QtGui.QColor):
-                        row_color = bg.name().replace("#", "")
+                    if value:
+                        widths[col] = max(widths[col], len(str(value)))
 
-            ws.append(row_data)
+                    # Берём цвет из BackgroundRole
+                    if col == 0:
+                        bg = index.data(QtCore.Qt.BackgroundRole)
+                        if isinstance(bg, QtGui.QColor):
+                            row_color = bg.name().replace("#", "")
 
-            excel_row_number = ws.max_row
+                rows.append(row_data)
+                colors.append(row_color)
 
-            if row_color:
-                fill = PatternFill(
-                    start_color=row_color,
-                    end_color=row_color,
-                    fill_type="solid"
-                )
+        strategy = choose_export_strategy(
+            len(rows),
+            settings.value("export/stream_threshold", EXPORT_STREAM_THRESHOLD, type=int),
+            settings.value("export/csv_threshold", EXPORT_CSV_THRESHOLD, type=int)
+        )
+        writer, extension = EXPORT_WRITERS[strategy]
 
-                for cell in ws[excel_row_number]:
-                    cell.fill = fill
+        today_str = datetime.date.today().strftime("%Y-%m-%d")
+        file_path = f"{documents_path}/Список_сотрудников_{today_str}{extension}"
+
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            writer(file_path, headers, rows, colors, widths, profile)
+
+            if profile_memory:
+                # Второй проход во временный файл; его время не учитываем
+                with tempfile.TemporaryDirectory() as folder:
+                    with ExportProfile(trace_memory=True) as memory:
+                        writer(
+                            os.path.join(folder, "profile" + extension),
+                            headers, rows, colors, widths, memory
+                        )
+                profile.peak = memory.peak
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
 
-        # Автоширина колонок
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            ws.column_dimensions[column_letter].width = max_length + 2
+        # Вся работа экспорта — сумма фаз; окна ниже в замер не входят
+        if PERF.enabled:
+            PERF.record("export.excel", sum(elapsed for _, elapsed in profile.phases))
 
-        wb.save(file_path)
+        if profiling:
+            report = profile.report(strategy, len(rows))
+            with open(app_data_path("export_profile.log"), "a", encoding="utf-8") as f:
+                f.write(f"{datetime.datetime.now():%Y-%m-%d %H:%M:%S} {report}\n")
+            QtWidgets.QMessageBox.information(self, "Профиль экспорта", report)
 
         QtGui.QDesktopServices.openUrl(
             QtCore.QUrl.fromLocalFile(file_path)
         )
 
+    def open_export_settings(self):
+        ExportSettingsDialog(self).exec_()
+
     def open_highlight_settings(self):
         dialog = HighlightSettingsDialog(self)
         if dialog.exec_():
             if hasattr(self, "model"):
                 self.model.refresh_experience()
+            self.reminders.rebuild()
 
     def open_settings(self):
         dialog = DbSettingsDialog(self)
@@ -596,31 +2574,21 @@ class ExperienceApp(QtWidgets.QMainWindow):
 
     def connect_to_database(self):
 
-        settings = QtCore.QSettings("MyCompany", "HRApp")
-
-        host = settings.value("db/host", "192.168.0.250")
-        path = settings.value("db/path", r"c:\invent\HR.FDB")
-        user = settings.value("db/user", "sysdba")
-
-        encrypted = settings.value("db/password", encrypt_password("m"))
-        password = decrypt_password(encrypted)
+        connect_kwargs = db_connect_kwargs()
 
-        charset = settings.value("db/charset", "WIN1251")
-        port = settings.value("db/port", 3050, type=int)
-
-        if not host or not path:
+        if connect_kwargs is None:
             self.open_settings()
             return
 
         try:
-            self.conn = fdb.connect(
-                dsn=f"{host}:{path}",
-                user=user,
-                password=password,
-                charset=charset,
-                port=port
-            )
-            self.init_model()
+            with PERF.span("db.connect"):
+                self.conn = fdb.connect(**connect_kwargs)
+            self.db = EmployeesDb(self.conn, connect_kwargs)
+
+            # Новое подключение — новый журнал; старый дописывает очередь в фоне
+            if self.audit is not None and self.audit.connect_kwargs != connect_kwargs:
+                self.audit.close()
+                self.audit = None
 
         except Exception:
             QtWidgets.QMessageBox.warning(
@@ -629,18 +2597,56 @@ class ExperienceApp(QtWidgets.QMainWindow):
                 "Не удалось подключиться к базе данных."
             )
             self.open_settings()
+            return
+
+        # Подключение есть; дальше ошибки — не про настройки подключения
+        try:
+            self.db.ensure_version_column()
+            self.init_model()
+
+        except SchemaError as e:
+            QtWidgets.QMessageBox.critical(self, "Структура базы данных", str(e))
+
+        except Exception as e:
+            QtWidgets.QMessageBox.warning(
+                self,
+                "Ошибка загрузки",
+                f"Не удалось загрузить список сотрудников:\n{e}"
+            )
 
     def init_model(self):
 
-        self.model = EmployeesModel(self.conn)
+        if hasattr(self, "model"):
+            # Переподключение: дописываем хвост старой модели
+            self.model.flush_all()
+            if self.model.loader is not None:
+                self.model.loader.shutdown(wait=False)
+            self.undo_group.removeStack(self.model.undo_stack)
+            self.add_btn.clicked.disconnect()
+            self.table.customContextMenuRequested.disconnect()
+
+        # Журнал один на подключение и переживает пересборку модели
+        if self.audit is None:
+            self.audit = AuditLog(self.db.connect_kwargs, self)
+            self.audit.historyReady.connect(self.show_history)
+
+        # Полный список грузится в фоне, страницы поиска — по запросу
+        self.model = EmployeesModel(
+            self.db,
+            server_mode=self.server_search_action.isChecked(),
+            background=True
+        )
         self.model.refresh_experience()
 
-        self.proxy = QtCore.QSortFilterProxyModel()
+        self.proxy = EmployeesProxyModel()
         self.proxy.setSourceModel(self.model)
         self.proxy.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
         self.proxy.setFilterKeyColumn(-1)
 
-        self.search_edit.textChanged.connect(self.proxy.setFilterFixedString)
+        if self.model.server_mode:
+            self.model.set_search(self.search_edit.text())
+        else:
+            self.proxy.setFilterFixedString(self.search_edit.text())
 
         self.table.setModel(self.proxy)
         header = self.table.horizontalHeader()
@@ -675,6 +2681,117 @@ class ExperienceApp(QtWidgets.QMainWindow):
 
         self.add_btn.clicked.connect(self.model.add_employee)
 
+        self.dashboard.set_model(self.model)
+
+        self.undo_group.addStack(self.model.undo_stack)
+        self.undo_group.setActiveStack(self.model.undo_stack)
+        self.model.writeFailed.connect(self.on_write_failed)
+        self.model.conflictsDetected.connect(self.resolve_conflicts)
+        self.model.audit = self.audit
+        self.reminders.set_model(self.model)
+
+    def on_search_text(self, text):
+        if not hasattr(self, "model"):
+            return
+
+        if self.model.server_mode:
+            self.search_timer.start()
+        else:
+            self.proxy.setFilterFixedString(text)
+
+    def run_server_search(self):
+        if hasattr(self, "model") and self.model.server_mode:
+            self.model.set_search(self.search_edit.text())
+
+    def toggle_server_search(self, checked):
+        QtCore.QSettings("MyCompany", "HRApp").setValue(
+            "search/server_mode", checked
+        )
+
+        self.update_search_placeholder()
+
+        # Без модели (нет подключения или структура БД не готова) — нечего пересоздавать
+        if hasattr(self, "model"):
+            self.init_model()
+
+    def update_search_placeholder(self):
+        self.search_edit.setPlaceholderText(
+            "Поиск на сервере: фамилия, *часть ФИО, год, дата или период 2000..2005"
+            if self.server_search_action.isChecked() else "Поиск по всем столбцам..."
+        )
+
+    def resolve_conflicts(self, conflicts):
+
+        def describe(values):
+            if values is None:
+                return "запись удалена"
+            _, fio, hire_date, note = values
+            date = hire_date.strftime("%d.%m.%Y") if hire_date else "—"
+            return f"ФИО: {fio}\nДата приема: {date}\nПримечание: {note or ''}"
+
+        for emp_id, mine, theirs, version in conflicts:
+            box = QtWidgets.QMessageBox(self)
+            box.setIcon(QtWidgets.QMessageBox.Warning)
+            box.setWindowTitle("Запись изменена другим пользователем")
+            box.setText(
+                "Пока вы редактировали запись, её изменил другой пользователь.\n\n"
+                f"Ваш вариант:\n{describe(mine)}\n\n"
+                f"В базе данных:\n{describe(theirs)}"
+            )
+            keep_btn = box.addButton("Оставить мой вариант", QtWidgets.QMessageBox.AcceptRole)
+            box.addButton("Принять вариант из БД", QtWidgets.QMessageBox.RejectRole)
+            box.exec_()
+
+            self.model.resolve_conflict(
+                emp_id, mine, theirs, version,
+                keep_mine=box.clickedButton() == keep_btn
+            )
+
+    def on_write_failed(self, message):
+        QtWidgets.QMessageBox.warning(
+            self,
+            "Ошибка записи",
+            f"Изменения не сохранены в базе данных:\n{message}\n\n"
+            "Таблица будет перечитана."
+        )
+        self.model.reload()
+
+    def toggle_tray_mode(self, checked):
+        QtCore.QSettings("MyCompany", "HRApp").setValue("reminders/tray", checked)
+        self.tray.setVisible(checked)
+        QtWidgets.QApplication.setQuitOnLastWindowClosed(not checked)
+        self.reminders.set_active(checked)
+
+    def show_from_tray(self):
+        self.showNormal()
+        self.activateWindow()
+
+    def quit_from_tray(self):
+        self.quitting = True
+        self.close()
+        QtWidgets.QApplication.quit()
+
+    def closeEvent(self, event):
+        # В режиме трея окно только прячется, напоминания продолжают работать
+        if self.tray_action.isChecked() and not self.quitting:
+            event.ignore()
+            self.hide()
+            return
+
+        # Не теряем изменения, ждущие отложенной записи
+        if hasattr(self, "model"):
+            self.model.flush_all()
+        if self.audit is not None:
+            # Выход: здесь дождаться записи журнала можно и нужно
+            self.audit.close(wait=True)
+        super().closeEvent(event)
+
+    def show_history(self, emp_id, records):
+        fio = self.history_requests.pop(emp_id, None)
+        if fio is None:
+            return
+        AuditHistoryDialog(fio, records, self).exec_()
+
     def open_context_menu(self, position):
 
         index = self.table.indexAt(position)
@@ -685,9 +2802,21 @@ class ExperienceApp(QtWidgets.QMainWindow):
         menu = QtWidgets.QMenu()
 
         delete_action = menu.addAction("Удалить запись")
+        bulk_action = menu.addAction("Задать значение для выделенных строк...")
+        history_action = menu.addAction("История изменений")
 
         action = menu.exec_(self.table.viewport().mapToGlobal(position))
 
+        if action == bulk_action:
+            self.set_value_for_selected()
+
+        if action == history_action:
+            emp_id, fio, hire_date, note = self.model.rows[
+                self.proxy.mapToSource(index).row()
+            ]
+            self.history_requests[emp_id] = fio
+            self.audit.history(emp_id)
+
         if action == delete_action:
 
             reply = QtWidgets.QMessageBox.question(
@@ -705,6 +2834,166 @@ class ExperienceApp(QtWidgets.QMainWindow):
                 self.model.delete_employee(source_row)
 
 
+    # ---------- Вставка из буфера обмена ----------
+    def paste_from_clipboard(self):
+
+        if not hasattr(self, "proxy"):
+            return
+
+        anchor = self.table.currentIndex()
+        if not anchor.isValid():
+            return
+
+        text = QtWidgets.QApplication.clipboard().text()
+        if not text:
+            return
+
+        # Excel: строки через \n (\r\n), ячейки через \t, в конце перевод строки
+        block = [
+            line.rstrip("\r").split("\t")
+            for line in text.rstrip("\r\n").split("\n")
+        ]
+
+        targets = []
+
+        selected = self.table.selectionModel().selectedIndexes()
+        if len(block) == 1 and len(block[0]) == 1 and len(selected) > 1:
+            # Одно значение на всё выделение
+            for index in selected:
+                targets.append((index.row(), index.column(), block[0][0]))
+        else:
+            for r_off, cells in enumerate(block):
+                proxy_row = anchor.row() + r_off
+                if proxy_row >= self.proxy.rowCount():
+                    break
+                for c_off, value in enumerate(cells):
+                    col = anchor.column() + c_off
+                    if col >= self.model.columnCount():
+                        break
+                    targets.append((proxy_row, col, value))
+
+        changes = {}
+        for proxy_row, col, value in targets:
+            # Вычисляемые столбцы внутри блока пропускаем
+            if col not in self.model.editable_columns:
+                continue
+            source_row = self.proxy.mapToSource(self.proxy.index(proxy_row, 0)).row()
+            changes.setdefault(source_row, {})[col] = value
+
+        self.apply_bulk_changes(changes)
+
+    def set_value_for_selected(self):
+
+        rows = sorted({
+            self.proxy.mapToSource(index).row()
+            for index in self.table.selectionModel().selectedIndexes()
+        })
+        if not rows:
+            return
+
+        columns = {self.model.headers[col]: col for col in self.model.editable_columns}
+
+        column_name, ok = QtWidgets.QInputDialog.getItem(
+            self,
+            "Массовое изменение",
+            f"Столбец (выделено строк: {len(rows)}):",
+            list(columns),
+            0,
+            False
+        )
+        if not ok:
+            return
+
+        value, ok = QtWidgets.QInputDialog.getText(
+            self,
+            "Массовое изменение",
+            f"Новое значение для «{column_name}»:"
+        )
+        if not ok:
+            return
+
+        col = columns[column_name]
+        self.apply_bulk_changes({row: {col: value} for row in rows})
+
+    def apply_bulk_changes(self, changes):
+
+        if not changes:
+            return
+
+        errors = self.model.bulk_update(changes)
+
+        if errors:
+            shown = "\n".join(errors[:10])
+            if len(errors) > 10:
+                shown += f"\n... и ещё {len(errors) - 10}"
+            QtWidgets.QMessageBox.warning(
+                self,
+                "Изменения не применены",
+                shown
+            )
+
+
+class ExportSettingsDialog(QtWidgets.QDialog):
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Настройки экспорта")
+        self.resize(400, 150)
+
+        layout = QtWidgets.QFormLayout(self)
+
+        self.stream_spin = QtWidgets.QSpinBox()
+        self.stream_spin.setRange(0, 10000000)
+        self.stream_spin.setSingleStep(1000)
+
+        self.csv_spin = QtWidgets.QSpinBox()
+        self.csv_spin.setRange(0, 10000000)
+        self.csv_spin.setSingleStep(10000)
+
+        self.profile_checkbox = QtWidgets.QCheckBox(
+            "Записывать время фаз экспорта в журнал"
+        )
+        self.memory_checkbox = QtWidgets.QCheckBox(
+            "Замерять и пиковую память (экспорт выполняется дважды)"
+        )
+        self.memory_checkbox.setEnabled(False)
+        self.profile_checkbox.toggled.connect(self.memory_checkbox.setEnabled)
+
+        layout.addRow("Потоковая запись xlsx от (строк):", self.stream_spin)
+        layout.addRow("CSV вместо xlsx от (строк):", self.csv_spin)
+        layout.addRow(self.profile_checkbox)
+        layout.addRow(self.memory_checkbox)
+
+        self.save_btn = QtWidgets.QPushButton("Сохранить")
+        layout.addRow(self.save_btn)
+        self.save_btn.clicked.connect(self.accept)
+
+        self.load_settings()
+
+    def load_settings(self):
+        settings = QtCore.QSettings("MyCompany", "HRApp")
+        self.stream_spin.setValue(
+            settings.value("export/stream_threshold", EXPORT_STREAM_THRESHOLD, type=int)
+        )
+        self.csv_spin.setValue(
+            settings.value("export/csv_threshold", EXPORT_CSV_THRESHOLD, type=int)
+        )
+        self.profile_checkbox.setChecked(
+            settings.value("export/profile", False, type=bool)
+        )
+        self.memory_checkbox.setChecked(
+            settings.value("export/profile_memory", False, type=bool)
+        )
+
+    def accept(self):
+        settings = QtCore.QSettings("MyCompany", "HRApp")
+        settings.setValue("export/stream_threshold", self.stream_spin.value())
+        settings.setValue("export/csv_threshold", self.csv_spin.value())
+        settings.setValue("export/profile", self.profile_checkbox.isChecked())
+        settings.setValue("export/profile_memory", self.memory_checkbox.isChecked())
+        super().accept()
+
+
 class HighlightSettingsDialog(QtWidgets.QDialog):
 
     def __init__(self, parent=None):
@@ -833,5 +3122,11 @@ if __name__ == "__main__":
     if os.path.exists(icon_path):
         app.setWindowIcon(QtGui.QIcon(icon_path))
     window = ExperienceApp()
-    window.show()
+
+    # --tray: запуск свёрнутым в трей (например, из автозагрузки)
+    if "--tray" in sys.argv:
+        window.tray_action.setChecked(True)
+    else:
+        window.show()
+
     sys.exit(app.exec_())
\ No newline at end of file
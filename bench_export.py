@@ -0,0 +1,77 @@
+# Замер стратегий экспорта на синтетических данных:
+#   python bench_export.py [число строк ...]
+# Время и пиковая память меряются в разных прогонах: tracemalloc
+# замедляет запись в несколько раз.
+# По результатам подбираются EXPORT_STREAM_THRESHOLD / EXPORT_CSV_THRESHOLD в HR.py.
+import sys
+import os
+import random
+import datetime
+import tempfile
+
+from HR import (
+    EXPORT_WRITERS, ExportProfile, EmployeesModel,
+    add_years, service_years
+)
+
+
+def make_rows(count):
+    random.seed(count)
+    today = datetime.date.today()
+    colors = [None, None, None, "e6ffcb", "d2feff", "ebefff", "fff4bc", "ffb0a6"]
+
+    rows = []
+    row_colors = []
+    for i in range(count):
+        hire_date = today - datetime.timedelta(days=random.randint(0, 40 * 365))
+        years = service_years(hire_date, today)
+        next_m = next((m for m in (15, 20, 25, 30, 35, 40) if years < m), 45)
+        rows.append([
+            i + 1,
+            f"Сотрудник {i:06d} Иванович",
+            hire_date.strftime("%d.%m.%Y"),
+            years,
+            f"{add_years(hire_date, next_m).strftime('%d.%m.%Y')} — будет {next_m} лет",
+            "примечание" if i % 7 == 0 else None
+        ])
+        row_colors.append(random.choice(colors))
+    return rows, row_colors
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 3000, 5000, 20000, 50000]
+    repeat = 3
+    headers = EmployeesModel.headers
+
+    print(f"{'строк':>8} {'способ':>7} {'время, с':>9} {'пик, МБ':>8}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        for count in sizes:
+            rows, colors = make_rows(count)
+            widths = [
+                max([len(h)] + [len(str(r[col])) for r in rows if r[col]])
+                for col, h in enumerate(headers)
+            ]
+
+            for strategy, (writer, extension) in EXPORT_WRITERS.items():
+                path = os.path.join(folder, strategy + extension)
+
+                # Время — без tracemalloc, лучший из repeat прогонов;
+                # память — отдельным прогоном с трассировкой
+                times = []
+                for _ in range(repeat):
+                    with ExportProfile() as profile:
+                        writer(path, headers, rows, colors, widths, profile)
+                    times.append(sum(elapsed for _, elapsed in profile.phases))
+
+                with ExportProfile(trace_memory=True) as memory:
+                    writer(path, headers, rows, colors, widths, memory)
+
+                print(
+                    f"{count:>8} {strategy:>7} {min(times):>9.2f} "
+                    f"{memory.peak / 1024 / 1024:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,411 @@
 import sys
-import subprocess
+import os
 import ctypes
 import re
+import time
+import codecs
+import socket
+import ipaddress
+import configparser
+from concurrent.futures import ThreadPoolExecutor
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout,
     QPushButton, QLabel, QTextEdit
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QObject, QProcess, QSettings, pyqtSignal
+
+
+# Кодировка вывода netsh/ipconfig в русской консоли Windows
+CONSOLE_ENCODING = "cp866"
+
+
+# --- Профили сети ---
+# Файл net_profiles.ini лежит рядом с программой (или NETSWITCH_PROFILES);
+# если его нет, он создаётся с прежними настройками.
+def profiles_path():
+    path = os.environ.get("NETSWITCH_PROFILES")
+    if path:
+        return path
+    return os.path.join(
+        os.path.dirname(os.path.abspath(sys.argv[0])),
+        "net_profiles.ini"
+    )
+
+
+def default_profiles():
+    # Сервер БД берём из настроек HR.py
+    hr_settings = QSettings("MyCompany", "HRApp")
+    db_host = hr_settings.value("db/host", "192.168.0.250") or "192.168.0.250"
+    db_port = str(hr_settings.value("db/port", "3050") or "3050")
+
+    config = configparser.ConfigParser(interpolation=None)
+    config["DEFAULT"] = {
+        "probe_port": db_port,
+        "probe_timeout": "3",
+    }
+    config["Сеть суда"] = {
+        "ip": "192.168.0.192",
+        "mask": "255.255.0.0",
+        "gateway": "0.0.0.0",
+        "dns": "192.168.0.215",
+        "probe_host": db_host,
+    }
+    config["Интернет"] = {
+        "ip": "10.10.0.71",
+        "mask": "255.255.255.0",
+        "gateway": "10.10.0.150",
+        "dns": "8.8.8.8",
+        "probe_host": "",
+        "probe_name": "ya.ru",
+    }
+    return config
+
+
+def load_profiles(path=None):
+    path = path or profiles_path()
+    config = configparser.ConfigParser(interpolation=None)
+
+    if os.path.exists(path):
+        config.read(path, encoding="utf-8")
+    else:
+        config = default_profiles()
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                config.write(f)
+        except OSError:
+            pass
+
+    profiles = []
+    for name in config.sections():
+        section = config[name]
+        profiles.append({
+            "name": name,
+            "ip": section.get("ip", ""),
+            "mask": section.get("mask", ""),
+            "gateway": section.get("gateway", ""),
+            "dns": section.get("dns", ""),
+            "probe_host": section.get("probe_host", "").strip(),
+            "probe_port": section.getint("probe_port", fallback=3050),
+            "probe_name": section.get("probe_name", "").strip(),
+            "probe_timeout": section.getfloat("probe_timeout", fallback=3.0),
+        })
+    return profiles
+
+
+# --- Проверка доступности после переключения ---
+def is_ip_literal(host):
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def probe_dns(name):
+    started = time.perf_counter()
+    try:
+        socket.getaddrinfo(name, None, proto=socket.IPPROTO_TCP)
+    except OSError as e:
+        return False, f"DNS {name}: ошибка ({e})"
+    elapsed = (time.perf_counter() - started) * 1000
+    return True, f"DNS {name}: {elapsed:.0f} мс"
+
+
+def probe_tcp(host, port, timeout):
+    # Адрес только что сменили — пока сеть поднимается, пробуем повторно,
+    # но не дольше timeout. Отказ в соединении — ответ сразу.
+    started = time.perf_counter()
+    deadline = started + timeout
+    last_error = None
+
+    while True:
+        attempt = time.perf_counter()
+        remaining = deadline - attempt
+        if remaining <= 0:
+            break
+        try:
+            with socket.create_connection((host, port), timeout=min(remaining, 1.0)):
+                latency = (time.perf_counter() - attempt) * 1000
+                return True, f"БД {host}:{port}: {latency:.0f} мс"
+        except ConnectionRefusedError as e:
+            last_error = e
+            break
+        except OSError as e:
+            last_error = e
+            time.sleep(min(0.2, max(0.0, deadline - time.perf_counter())))
+
+    total = (time.perf_counter() - started) * 1000
+    return False, f"БД {host}:{port}: недоступна за {total:.0f} мс ({last_error})"
+
+
+class ProbeSignals(QObject):
+    # Результаты приходят из пула потоков, доставка в GUI — через очередь
+    result = pyqtSignal(bool, str)
+
+
+# --- Разбор вывода netsh / ipconfig ---
+# Каждая функция проходит текст один раз и возвращает записи по адаптерам.
+# Понимает английскую и русскую локаль консоли.
+
+CONNECTED_STATES = ("connected", "подключен")
+
+# Заголовки блоков ipconfig: «<тип> adapter <имя>:» / «Адаптер <тип> <имя>:»
+IPCONFIG_HEADER_PREFIXES = (
+    "Адаптер беспроводной локальной сети ",
+    "Адаптер туннельного подключения ",
+    "Адаптер Ethernet ",
+    "Адаптер PPP ",
+    "Неизвестный адаптер ",
+    "Адаптер ",
+)
+
+FIELD_RE = re.compile(r"^\s+([^:]*?)[\s.]*:\s*(.*)$")
+IPV4_RE = re.compile(r"\b(\d{1,3}(?:\.\d{1,3}){3})\b")
+MASK_RE = re.compile(r"\((?:mask|маска)\s+([\d.]+)\)", re.IGNORECASE)
+
+
+def new_adapter(name):
+    return {
+        "name": name,
+        "ipv4": None,
+        "mask": None,
+        "gateway": None,
+        "dns": [],
+        "disconnected": False,
+    }
+
+
+def split_field(line):
+    # ("ключ", "значение") или ("", значение) для строки-продолжения
+    # (второй шлюз / DNS-сервер с большим отступом и без метки)
+    stripped = line.strip()
+    indent = len(line) - len(line.lstrip())
+    if indent >= 10 and " " not in stripped:
+        return "", stripped
+    match = FIELD_RE.match(line)
+    if match:
+        return match.group(1).strip().lower(), match.group(2).strip()
+    return None, None
+
+
+def first_ipv4(value):
+    match = IPV4_RE.search(value)
+    return match.group(1) if match else None
+
+
+def parse_interfaces(text):
+    # netsh interface show interface: таблица после строки из дефисов.
+    # Первые три колонки — одно слово, имя может содержать пробелы.
+    interfaces = []
+    in_table = False
+
+    for line in text.splitlines():
+        if not in_table:
+            in_table = line.startswith("---")
+            continue
+
+        parts = line.split(None, 3)
+        if len(parts) < 4:
+            continue
+
+        admin_state, state, iface_type, name = parts
+        interfaces.append({
+            "admin_state": admin_state,
+            "state": state,
+            "type": iface_type,
+            "name": name.strip(),
+            "connected": state.lower() in CONNECTED_STATES,
+        })
+
+    return interfaces
+
+
+def ipconfig_adapter_name(header):
+    header = header.rstrip().rstrip(":")
+    if " adapter " in header:
+        return header.split(" adapter ", 1)[1]
+    for prefix in IPCONFIG_HEADER_PREFIXES:
+        if header.startswith(prefix):
+            return header[len(prefix):]
+    return header
+
+
+def parse_ipconfig(text):
+    adapters = {}
+    current = None
+    last_key = None
+
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+
+        if not line[0].isspace():
+            # Заголовок адаптера заканчивается двоеточием;
+            # «Windows IP Configuration» — нет
+            if line.rstrip().endswith(":"):
+                current = new_adapter(ipconfig_adapter_name(line))
+                adapters[current["name"]] = current
+            else:
+                current = None
+            last_key = None
+            continue
+
+        if current is None:
+            continue
+
+        key, value = split_field(line)
+        if key is None:
+            continue
+        if key == "":
+            key = last_key
+        else:
+            last_key = key
+
+        if not key:
+            continue
+
+        if "ipv4" in key:
+            current["ipv4"] = current["ipv4"] or first_ipv4(value)
+        elif "mask" in key or "маска" in key:
+            current["mask"] = first_ipv4(value)
+        elif "gateway" in key or "шлюз" in key:
+            current["gateway"] = current["gateway"] or first_ipv4(value)
+        elif "dns server" in key or "dns-сервер" in key:
+            ip = first_ipv4(value)
+            if ip:
+                current["dns"].append(ip)
+        elif "media state" in key or "состояние среды" in key:
+            current["disconnected"] = True
+
+    return adapters
+
+
+def parse_interface_config(text):
+    # netsh interface ip show config name="...": один адаптер
+    current = None
+    last_key = None
+
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+
+        if not line[0].isspace():
+            match = re.search(r'"(.+)"', line)
+            if match:
+                current = new_adapter(match.group(1))
+            last_key = None
+            continue
+
+        if current is None:
+            continue
+
+        key, value = split_field(line)
+        if key is None:
+            continue
+        if key == "":
+            key = last_key
+        else:
+            last_key = key
+
+        if not key or "metric" in key or "метрика" in key:
+            continue
+
+        if key in ("ip address", "ip-адрес"):
+            current["ipv4"] = current["ipv4"] or first_ipv4(value)
+        elif "prefix" in key or "префикс" in key:
+            match = MASK_RE.search(value)
+            if match and not current["mask"]:
+                current["mask"] = match.group(1)
+        elif "gateway" in key or "шлюз" in key:
+            current["gateway"] = current["gateway"] or first_ipv4(value)
+        elif "dns" in key:
+            ip = first_ipv4(value)
+            if ip:
+                current["dns"].append(ip)
+
+    return current
+
+
+class InterfaceCache:
+    """Разобранное состояние интерфейсов с коротким сроком жизни.
+
+    Полное обновление (show interface + ipconfig) нужно только когда
+    кэш устарел; после переключения перечитывается один адаптер.
+    """
+
+    def __init__(self, ttl=5.0):
+        self.ttl = ttl
+        self.interfaces = []
+        self.adapters = {}
+        self.stamp = 0.0
+
+    def is_fresh(self):
+        return bool(self.interfaces) and time.monotonic() - self.stamp < self.ttl
+
+    def invalidate(self):
+        self.stamp = 0.0
+
+    def update_interfaces(self, text):
+        self.interfaces = parse_interfaces(text)
+
+    def update_ipconfig(self, text):
+        self.adapters = parse_ipconfig(text)
+        self.stamp = time.monotonic()
+
+    def update_adapter(self, text):
+        adapter = parse_interface_config(text)
+        if adapter:
+            self.adapters[adapter["name"]] = adapter
+            self.stamp = time.monotonic()
+        return adapter
+
+    def active_interface(self):
+        for iface in self.interfaces:
+            if iface["connected"] and iface["type"].lower() != "loopback":
+                return iface["name"]
+        return "Ethernet"
+
+    def ip_of(self, name):
+        adapter = self.adapters.get(name)
+        if adapter and adapter["ipv4"]:
+            return adapter["ipv4"]
+        return "Не найден"
+
+
+def bench_parse(folder, repeat=1000):
+    # Файлы корпуса: <локаль>_<show_interface|ipconfig|show_config>.txt в cp866
+    parsers = (
+        ("show_interface", parse_interfaces),
+        ("show_config", parse_interface_config),
+        ("ipconfig", parse_ipconfig),
+    )
+
+    for file_name in sorted(os.listdir(folder)):
+        for marker, parser in parsers:
+            if marker in file_name:
+                break
+        else:
+            continue
+
+        with open(os.path.join(folder, file_name), encoding=CONSOLE_ENCODING) as f:
+            text = f.read()
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = parser(text)
+        elapsed = (time.perf_counter() - started) / repeat * 1000000
+
+        print(f"{file_name}: {elapsed:.1f} мкс")
+        print(f"  {result}")
 
 
 # --- Проверка / запрос прав администратора ---
 def ensure_admin():
+    # Вне Windows (отладка с поддельным netsh) права не нужны
+    if sys.platform != "win32":
+        return True
+
     if ctypes.windll.shell32.IsUserAnAdmin():
         return True
     else:
@@ -21,11 +415,106 @@ def ensure_admin():
         return False
 
 
+# --- Асинхронный запуск команд ---
+class CommandJob(QObject):
+    output = pyqtSignal(str)                # очередная строка stdout
+    error = pyqtSignal(str)                 # очередная строка stderr
+    finished = pyqtSignal(int, str, float)  # код возврата, весь stdout, секунды
+
+    def __init__(self, cmd, parent=None):
+        super().__init__(parent)
+        self.cmd = cmd
+        self.stdout = ""
+
+
+class CommandRunner(QObject):
+    """Запускает команды оболочки через QProcess, не блокируя GUI.
+
+    Это единственное место, где NetSwitcher обращается к системе: можно
+    передать свой runner, а вне Windows команды идут через /bin/sh, так
+    что поток переключения проверяется с поддельным netsh в PATH.
+    """
+
+    def __init__(self, encoding=CONSOLE_ENCODING, parent=None):
+        super().__init__(parent)
+        self.encoding = encoding
+        self.jobs = set()
+
+    def run(self, cmd):
+        job = CommandJob(cmd, self)
+        process = QProcess(job)
+
+        if sys.platform == "win32":
+            # Кавычки в name="..." cmd.exe должен получить как есть
+            process.setProgram("cmd.exe")
+            process.setNativeArguments(f"/c {cmd}")
+        else:
+            process.setProgram("/bin/sh")
+            process.setArguments(["-c", cmd])
+
+        out_decoder = codecs.getincrementaldecoder(self.encoding)("replace")
+        err_decoder = codecs.getincrementaldecoder(self.encoding)("replace")
+        buffers = {"out": "", "err": ""}
+        started = time.perf_counter()
+
+        def emit_lines(key, text, signal, final=False):
+            buffers[key] += text
+            *lines, buffers[key] = buffers[key].split("\n")
+            if final and buffers[key]:
+                lines.append(buffers[key])
+                buffers[key] = ""
+            for line in lines:
+                line = line.rstrip("\r")
+                if line.strip():
+                    signal.emit(line)
+
+        def read_stdout():
+            text = out_decoder.decode(bytes(process.readAllStandardOutput()))
+            job.stdout += text
+            emit_lines("out", text, job.output)
+
+        def read_stderr():
+            text = err_decoder.decode(bytes(process.readAllStandardError()))
+            emit_lines("err", text, job.error)
+
+        def on_finished(exit_code, _status):
+            read_stdout()
+            read_stderr()
+            tail = out_decoder.decode(b"", final=True)
+            job.stdout += tail
+            emit_lines("out", tail, job.output, final=True)
+            emit_lines("err", err_decoder.decode(b"", final=True), job.error, final=True)
+
+            self.jobs.discard(job)
+            job.finished.emit(exit_code, job.stdout, time.perf_counter() - started)
+            job.deleteLater()
+
+        def on_error(error):
+            # Не удалось даже запустить процесс — finished не придёт
+            if error == QProcess.FailedToStart:
+                job.error.emit(process.errorString())
+                self.jobs.discard(job)
+                job.finished.emit(-1, "", time.perf_counter() - started)
+                job.deleteLater()
+
+        process.readyReadStandardOutput.connect(read_stdout)
+        process.readyReadStandardError.connect(read_stderr)
+        process.finished.connect(on_finished)
+        process.errorOccurred.connect(on_error)
+
+        self.jobs.add(job)
+        process.start()
+        return job
+
+
 class NetSwitcher(QWidget):
-    def __init__(self):
+    def __init__(self, runner=None):
         super().__init__()
+        self.runner = runner or CommandRunner(parent=self)
+        self.cache = InterfaceCache()
+        self.iface = None
         self.setWindowTitle("Переключение сети")
-        self.setFixedSize(420, 420)
+        self.setFixedSize(420, 480)
 
         layout = QVBoxLayout()
 
@@ -34,13 +523,17 @@ class NetSwitcher(QWidget):
         self.ip_label.setStyleSheet("font-size: 14px; font-weight: bold;")
         layout.addWidget(self.ip_label)
 
-        self.btn_local = QPushButton("Сеть суда")
-        self.btn_local.clicked.connect(self.set_local)
-        layout.addWidget(self.btn_local)
+        self.probe_label = QLabel("")
+        self.probe_label.setAlignment(Qt.AlignCenter)
+        self.probe_label.setWordWrap(True)
+        layout.addWidget(self.probe_label)
 
-        self.btn_internet = QPushButton("Интернет")
-        self.btn_internet.clicked.connect(self.set_internet)
-        layout.addWidget(self.btn_internet)
+        self.profile_buttons = []
+        for profile in load_profiles():
+            btn = QPushButton(profile["name"])
+            btn.clicked.connect(lambda _, p=profile: self.apply_profile(p))
+            layout.addWidget(btn)
+            self.profile_buttons.append(btn)
 
         self.log = QTextEdit()
         self.log.setReadOnly(True)
@@ -56,80 +549,234 @@ class NetSwitcher(QWidget):
 
         self.setLayout(layout)
 
-        self.iface = self.get_active_interface()
-        self.update_ip()
+        self.probe_pool = ThreadPoolExecutor(max_workers=4)
+        self.probe_signals = ProbeSignals(self)
+        self.probe_signals.result.connect(self.show_probe_result)
+        self.probe_lines = []
+        self.probe_pending = 0
+        self.probe_ok = True
+        self.adapter_pending = False
+
+        self.set_busy(True)
+        self.refresh_status()
 
 
     def log_message(self, text):
         self.log.append(text)
 
 
-    def run_cmd(self, cmd):
-        self.log_message(f"> {cmd}")
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding="cp866")
-        if result.stdout:
-            self.log_message(result.stdout.strip())
-        if result.stderr:
-            self.log_message("ERROR: " + result.stderr.strip())
-
-
-    def get_active_interface(self):
-        result = subprocess.check_output("netsh interface show interface", shell=True, encoding="cp866")
-        for line in result.splitlines():
-            if "Connected" in line or "Подключен" in line:
-                parts = line.split()
-                return parts[-1]
-        return "Ethernet"
-
-
-    def get_current_ip(self):
-        result = subprocess.check_output("ipconfig", shell=True, encoding="cp866")
-        match = re.search(r"IPv4.*?:\s*([\d\.]+)", result)
-        if match:
-            return match.group(1)
-        return "Не найден"
+    def set_busy(self, busy):
+        for btn in self.profile_buttons:
+            btn.setEnabled(not busy)
 
 
-    def update_ip(self):
-        ip = self.get_current_ip()
-        self.ip_label.setText(f"Текущий IP: {ip}")
+    def update_busy(self):
+        # Новое переключение — только когда прежнее полностью досчитано:
+        # иначе поздние результаты проверок попадут в чужой подсчёт
+        self.set_busy(self.adapter_pending or self.probe_pending > 0)
 
 
-    def apply_settings(self, ip, mask, gateway, dns):
+    def run_cmd(self, cmd, on_finished=None):
+        self.log_message(f"> {cmd}")
+        job = self.runner.run(cmd)
+        job.output.connect(self.log_message)
+        job.error.connect(lambda line: self.log_message("ERROR: " + line))
+
+        def done(exit_code, _stdout, elapsed):
+            self.log_message(f"[код {exit_code}, {elapsed:.2f} с]")
+            if on_finished:
+                on_finished(exit_code)
+
+        job.finished.connect(done)
+        return job
+
+
+    def run_sequence(self, cmds, on_done):
+        # netsh для одного интерфейса запускаем строго по очереди;
+        # on_done(ok) получает False, если хоть одна команда упала
+        cmds = list(cmds)
+        failed = []
+
+        def next_cmd(exit_code=0):
+            if exit_code:
+                failed.append(exit_code)
+            if cmds:
+                self.run_cmd(cmds.pop(0), next_cmd)
+            else:
+                on_done(not failed)
+
+        next_cmd()
+
+
+    def show_ip(self):
+        ip = self.cache.ip_of(self.iface)
+        self.ip_label.setText(f"Текущий IP: {ip} ({self.iface})")
+
+
+    def refresh_status(self, on_done=None):
+        # Без on_done по окончании снимается занятость кнопок,
+        # с ним — управление передаётся дальше (переключение профиля)
+        def finish():
+            if on_done:
+                on_done()
+            else:
+                self.set_busy(False)
+
+        if self.cache.is_fresh():
+            self.iface = self.cache.active_interface()
+            self.show_ip()
+            finish()
+            return
+
+        # Интерфейсы и адреса определяются параллельно
+        self.ip_label.setText("Текущий IP: определение...")
+        started = time.perf_counter()
+        pending = {"count": 2}
+
+        iface_job = self.runner.run("netsh interface show interface")
+        ip_job = self.runner.run("ipconfig")
+
+        def on_iface(_exit_code, stdout, _elapsed):
+            self.cache.update_interfaces(stdout)
+            both_done()
+
+        def on_ip(_exit_code, stdout, _elapsed):
+            self.cache.update_ipconfig(stdout)
+            both_done()
+
+        def both_done():
+            pending["count"] -= 1
+            if pending["count"]:
+                return
+            self.iface = self.cache.active_interface()
+            self.show_ip()
+            self.log_message(
+                f"Состояние обновлено за {time.perf_counter() - started:.2f} с"
+            )
+            finish()
+
+        iface_job.finished.connect(on_iface)
+        ip_job.finished.connect(on_ip)
+
+
+    def refresh_adapter(self):
+        # После переключения перечитываем только изменённый адаптер
+        self.adapter_pending = True
+        job = self.runner.run(f'netsh interface ip show config name="{self.iface}"')
+
+        def done(_exit_code, stdout, _elapsed):
+            self.cache.update_adapter(stdout)
+            self.show_ip()
+            self.adapter_pending = False
+            self.update_busy()
+
+        job.finished.connect(done)
+
+
+    def apply_settings(self, ip, mask, gateway, dns, on_done=None):
+        self.set_busy(True)
         self.log.clear()
         self.log_message(f"Интерфейс: {self.iface}")
         self.log_message("Применяем настройки...\n")
-
-        self.run_cmd(
-            f'netsh interface ip set address name="{self.iface}" source=static addr={ip} mask={mask} gateway={gateway}'
-        )
-        self.run_cmd(
-            f'netsh interface ip set dns name="{self.iface}" source=static addr={dns} register=PRIMARY'
-        )
-
-        self.log_message("\nГотово.")
-        self.update_ip()
-
-
-    def set_local(self):
-        self.apply_settings(
-            "192.168.0.192",
-            "255.255.0.0",
-            "0.0.0.0",
-            "192.168.0.215"
-        )
-
-
-    def set_internet(self):
-        self.apply_settings(
-            "10.10.0.71",
-            "255.255.255.0",
-            "10.10.0.150",
-            "8.8.8.8"
-        )
+        started = time.perf_counter()
+
+        def done(ok):
+            self.log_message(
+                f"\nГотово за {time.perf_counter() - started:.2f} с."
+            )
+            if not ok:
+                # Состояние после неудачной команды неизвестно —
+                # следующее переключение перечитает всё заново
+                self.cache.invalidate()
+            self.refresh_adapter()
+            if on_done:
+                on_done()
+
+        self.run_sequence([
+            f'netsh interface ip set address name="{self.iface}" source=static addr={ip} mask={mask} gateway={gateway}',
+            f'netsh interface ip set dns name="{self.iface}" source=static addr={dns} register=PRIMARY',
+        ], done)
+
+
+    def apply_profile(self, profile):
+        self.set_busy(True)
+        self.probe_label.setText("")
+        # Активный интерфейс уточняем перед каждым переключением:
+        # свежий кэш отвечает сразу, устаревший — перечитывается
+        self.refresh_status(lambda: self.apply_settings(
+            profile["ip"],
+            profile["mask"],
+            profile["gateway"],
+            profile["dns"],
+            on_done=lambda: self.start_probe(profile)
+        ))
+
+
+    def start_probe(self, profile):
+        tasks = []
+        timeout = profile["probe_timeout"]
+
+        name = profile["probe_name"]
+        host = profile["probe_host"]
+        if not name and host and not is_ip_literal(host):
+            name = host
+
+        if name:
+            tasks.append(self.probe_pool.submit(probe_dns, name))
+        if host:
+            tasks.append(self.probe_pool.submit(
+                probe_tcp, host, profile["probe_port"], timeout
+            ))
+
+        if not tasks:
+            return
+
+        self.probe_lines = []
+        self.probe_pending = len(tasks)
+        self.probe_ok = True
+        self.probe_label.setStyleSheet("")
+        self.probe_label.setText("Проверка доступности...")
+
+        signals = self.probe_signals
+
+        def on_task_done(future):
+            # Выполняется в потоке пула — только отправляем сигнал
+            try:
+                ok, text = future.result()
+            except Exception as e:
+                ok, text = False, f"Ошибка проверки: {e}"
+            signals.result.emit(ok, text)
+
+        for task in tasks:
+            task.add_done_callback(on_task_done)
+
+
+    def show_probe_result(self, ok, text):
+        self.log_message(("OK: " if ok else "FAIL: ") + text)
+        self.probe_lines.append(text)
+        self.probe_label.setText("\n".join(self.probe_lines))
+
+        self.probe_ok = self.probe_ok and ok
+        self.probe_pending -= 1
+        if self.probe_pending == 0:
+            color = "#2e7d32" if self.probe_ok else "#c62828"
+            self.probe_label.setStyleSheet(f"color: {color}; font-weight: bold;")
+            self.update_busy()
+
+
+    def closeEvent(self, event):
+        self.probe_pool.shutdown(wait=False)
+        super().closeEvent(event)
 
 
 if __name__ == "__main__":
+    if "--bench-parse" in sys.argv:
+        folder = sys.argv[sys.argv.index("--bench-parse") + 1:] or [
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "net_fixtures")
+        ]
+        bench_parse(folder[0])
+        sys.exit()
+
     if not ensure_admin():
         sys.exit()
 
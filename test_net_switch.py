@@ -0,0 +1,130 @@
+# Разбор вывода netsh / ipconfig на корпусе net_fixtures:
+#   python -m unittest test_net_switch
+import os
+import unittest
+
+from net_switch_qt import (
+    CONSOLE_ENCODING, InterfaceCache,
+    parse_interfaces, parse_ipconfig, parse_interface_config
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "net_fixtures")
+
+ISATAP = "isatap.{8A3F2C1D-6B7E-4F90-A1B2-C3D4E5F60718}"
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding=CONSOLE_ENCODING) as f:
+        return f.read()
+
+
+class ShowInterfaceTest(unittest.TestCase):
+
+    def test_en(self):
+        interfaces = parse_interfaces(fixture("en_show_interface.txt"))
+        self.assertEqual(
+            [(i["name"], i["state"], i["connected"]) for i in interfaces],
+            [
+                ("Wi-Fi", "Disconnected", False),
+                ("Ethernet 2", "Connected", True),
+                ("VirtualBox Host-Only Network", "Disconnected", False),
+            ]
+        )
+        self.assertEqual(interfaces[2]["admin_state"], "Disabled")
+
+    def test_ru(self):
+        interfaces = parse_interfaces(fixture("ru_show_interface.txt"))
+        self.assertEqual(
+            [(i["name"], i["state"], i["connected"]) for i in interfaces],
+            [
+                ("Беспроводная сеть", "Отключен", False),
+                ("Подключение по локальной сети 2", "Подключен", True),
+                ("Ethernet", "Отключен", False),
+            ]
+        )
+        self.assertEqual(interfaces[2]["admin_state"], "Запрещен")
+
+
+class IpconfigTest(unittest.TestCase):
+
+    def test_en(self):
+        adapters = parse_ipconfig(fixture("en_ipconfig.txt"))
+        self.assertEqual(list(adapters), ["Wi-Fi", "Ethernet 2", ISATAP])
+
+        ethernet = adapters["Ethernet 2"]
+        self.assertEqual(ethernet["ipv4"], "10.10.0.71")
+        self.assertEqual(ethernet["mask"], "255.255.255.0")
+        # IPv6-шлюз в первой строке, IPv4 — на строке-продолжении
+        self.assertEqual(ethernet["gateway"], "10.10.0.150")
+        self.assertFalse(ethernet["disconnected"])
+
+        self.assertTrue(adapters["Wi-Fi"]["disconnected"])
+        self.assertIsNone(adapters["Wi-Fi"]["ipv4"])
+        self.assertTrue(adapters[ISATAP]["disconnected"])
+
+    def test_ru(self):
+        adapters = parse_ipconfig(fixture("ru_ipconfig.txt"))
+        self.assertEqual(
+            list(adapters),
+            ["Беспроводная сеть", "Подключение по локальной сети 2", ISATAP]
+        )
+
+        lan = adapters["Подключение по локальной сети 2"]
+        self.assertEqual(lan["ipv4"], "192.168.0.192")
+        self.assertEqual(lan["mask"], "255.255.0.0")
+        self.assertEqual(lan["gateway"], "0.0.0.0")
+        self.assertFalse(lan["disconnected"])
+
+        self.assertTrue(adapters["Беспроводная сеть"]["disconnected"])
+        self.assertTrue(adapters[ISATAP]["disconnected"])
+
+
+class ShowConfigTest(unittest.TestCase):
+
+    def test_en(self):
+        adapter = parse_interface_config(fixture("en_show_config.txt"))
+        self.assertEqual(adapter["name"], "Ethernet 2")
+        self.assertEqual(adapter["ipv4"], "10.10.0.71")
+        self.assertEqual(adapter["mask"], "255.255.255.0")
+        self.assertEqual(adapter["gateway"], "10.10.0.150")
+        # Второй DNS-сервер — на строке-продолжении
+        self.assertEqual(adapter["dns"], ["8.8.8.8", "8.8.4.4"])
+
+    def test_ru(self):
+        adapter = parse_interface_config(fixture("ru_show_config.txt"))
+        self.assertEqual(adapter["name"], "Подключение по локальной сети 2")
+        self.assertEqual(adapter["ipv4"], "192.168.0.192")
+        self.assertEqual(adapter["mask"], "255.255.0.0")
+        self.assertEqual(adapter["gateway"], "0.0.0.0")
+        self.assertEqual(adapter["dns"], ["192.168.0.215"])
+
+
+class InterfaceCacheTest(unittest.TestCase):
+
+    def test_fresh_until_ttl_or_invalidate(self):
+        cache = InterfaceCache(ttl=60)
+        self.assertFalse(cache.is_fresh())
+
+        cache.update_interfaces(fixture("en_show_interface.txt"))
+        cache.update_ipconfig(fixture("en_ipconfig.txt"))
+        self.assertTrue(cache.is_fresh())
+        self.assertEqual(cache.active_interface(), "Ethernet 2")
+        self.assertEqual(cache.ip_of("Ethernet 2"), "10.10.0.71")
+
+        cache.invalidate()
+        self.assertFalse(cache.is_fresh())
+
+        cache.ttl = 0
+        cache.update_ipconfig(fixture("en_ipconfig.txt"))
+        self.assertFalse(cache.is_fresh())
+
+    def test_update_adapter(self):
+        cache = InterfaceCache()
+        cache.update_ipconfig(fixture("ru_ipconfig.txt"))
+        cache.update_adapter(fixture("ru_show_config.txt"))
+        lan = cache.adapters["Подключение по локальной сети 2"]
+        self.assertEqual(lan["dns"], ["192.168.0.215"])
+
+
+if __name__ == "__main__":
+    unittest.main()